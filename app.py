@@ -1,16 +1,65 @@
+import time
+SCRIPT_STARTED = time.perf_counter() # Before the imports, so a cold start's import time is measured
+import json
+import os
+import random
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
 import pandas as pd
 from datetime import date, timedelta
 import uuid # For generating unique IDs
-import spacy # For NLP capabilities
-
-# --- Session State Initialization ---
-# Initialize core data structures in Streamlit's session state.
-# This data will persist as long as the user's browser session is active.
-if 'people' not in st.session_state:
-    st.session_state.people = [] # List to store Person objects
+from bulk_import import import_employments_csv, import_people_csv
+from compact_store import CompactStore
+from exports import EXPORT_FILE_NAMES, EXPORT_FORMATS, ExportCache
+from newsletter_nlp import (SPACY_MODEL, count_newsletter_documents, default_process_count, extract_entities,
+                            iter_newsletter_texts, load_ner_model)
+from overlay_store import OverlayStore
+import profiling
+from sqlite_store import SQLiteStore
+from synthetic_data import generate_network
+IMPORTS_DONE = time.perf_counter()
+
+# Path to a SQLite database file. When set, all sessions share one persistent
+# store; otherwise sessions share one in-memory dataset, each writing to its
+# own overlay until it commits.
+DATABASE_PATH = os.environ.get("TALENT_NETWORK_DB")
+# Set to 1 to load the spaCy model in the background once the first page is
+# up, so the first newsletter extraction does not wait for it.
+WARM_NLP = os.environ.get("TALENT_NETWORK_WARM_NLP") == "1"
+# Set to 1 (or open the app with ?profile=1) to time each section of every
+# rerun and count helper calls, shown in a debug panel at the bottom of the
+# sidebar; set TALENT_NETWORK_PROFILE_LOG to a path to also append each
+# rerun's profile there as a JSON line.
+PROFILE = os.environ.get("TALENT_NETWORK_PROFILE") == "1" or st.query_params.get("profile") == "1"
+PROFILE_LOG = os.environ.get("TALENT_NETWORK_PROFILE_LOG")
+PROFILE_HISTORY = 20 # Reruns kept for the debug panel
+# Set to a number of people to add a generated network of that size (see
+# synthetic_data.generate_network) to the seed data, e.g. to try the UI at scale.
+SYNTHETIC_PEOPLE = int(os.environ.get("TALENT_NETWORK_SYNTHETIC_PEOPLE", "0"))
+SYNTHETIC_SEED = int(os.environ.get("TALENT_NETWORK_SYNTHETIC_SEED", "0"))
+
+# --- Rerun Profiling ---
+if PROFILE:
+    unfinished = st.session_state.pop('rerun_profile', None)
+    if unfinished is not None:
+        # The previous run ended early (st.rerun()/st.stop()) and never reached the panel
+        unfinished.finish(interrupted=True)
+        recent = st.session_state.setdefault('recent_profiles', [])
+        recent.append(unfinished)
+        del recent[:-PROFILE_HISTORY]
+        if PROFILE_LOG:
+            profiling.append_jsonl(PROFILE_LOG, unfinished)
+    st.session_state.rerun_profile = profiling.start(label=st.session_state.get('current_view', 'list'))
+
+# --- Seed Data ---
+@profiling.timed("seed data")
+def build_seed_data():
+    """Returns the example (people, employments) lists used to seed a new session."""
+    people = [] # List to store Person objects
     # Example initial data (optional, for demonstration)
-    st.session_state.people.append({
+    people.append({
         "id": str(uuid.uuid4()),
         "name": "Daniel Sundheim",
         "current_title": "Founder & Chief Investment Officer",
@@ -19,7 +68,7 @@ if 'people' not in st.session_state:
         "linkedin_profile_url": "https://linkedin.com/in/danielsundheim",
         "reference_list_url": "#"
     })
-    st.session_state.people.append({
+    people.append({
         "id": str(uuid.uuid4()),
         "name": "Matthew Markovics",
         "current_title": "Partner",
@@ -28,7 +77,7 @@ if 'people' not in st.session_state:
         "linkedin_profile_url": "",
         "reference_list_url": ""
     })
-    st.session_state.people.append({
+    people.append({
         "id": str(uuid.uuid4()),
         "name": "Elizabeth Wahab",
         "current_title": "Investment Analyst",
@@ -38,32 +87,30 @@ if 'people' not in st.session_state:
         "reference_list_url": ""
     })
 
-
-if 'employments' not in st.session_state:
-    st.session_state.employments = [] # List to store Employment objects
+    employments = [] # List to store Employment objects
     # Map names to IDs for initial employment data
-    daniel_id = next((p['id'] for p in st.session_state.people if p['name'] == "Daniel Sundheim"), None)
-    matthew_id = next((p['id'] for p in st.session_state.people if p['name'] == "Matthew Markovics"), None)
-    elizabeth_id = next((p['id'] for p in st.session_state.people if p['name'] == "Elizabeth Wahab"), None)
+    daniel_id = next((p['id'] for p in people if p['name'] == "Daniel Sundheim"), None)
+    matthew_id = next((p['id'] for p in people if p['name'] == "Matthew Markovics"), None)
+    elizabeth_id = next((p['id'] for p in people if p['name'] == "Elizabeth Wahab"), None)
 
     if daniel_id:
-        st.session_state.employments.extend([
+        employments.extend([
             {"id": str(uuid.uuid4()), "person_id": daniel_id, "company_name": "D1 Capital Partners L.P.", "title": "Founder & Chief Investment Officer", "start_date": date(2018, 1, 1), "end_date": None},
             {"id": str(uuid.uuid4()), "person_id": daniel_id, "company_name": "Viking Global Investors", "title": "Portfolio Manager", "start_date": date(2002, 1, 1), "end_date": date(2017, 12, 31)}
         ])
     if matthew_id:
-        st.session_state.employments.extend([
+        employments.extend([
             {"id": str(uuid.uuid4()), "person_id": matthew_id, "company_name": "Durable Capital Partners LP", "title": "Partner", "start_date": date(2020, 1, 1), "end_date": None},
             {"id": str(uuid.uuid4()), "person_id": matthew_id, "company_name": "Viking Global Investors", "title": "Analyst", "start_date": date(2015, 6, 1), "end_date": date(2019, 12, 31)}
         ])
     if elizabeth_id:
-        st.session_state.employments.extend([
+        employments.extend([
             {"id": str(uuid.uuid4()), "person_id": elizabeth_id, "company_name": "B Capital", "title": "Associate", "start_date": date(2023, 3, 1), "end_date": None},
             {"id": str(uuid.uuid4()), "person_id": elizabeth_id, "company_name": "Viking Global Investors", "title": "Analyst", "start_date": date(2018, 1, 1), "end_date": date(2022, 12, 31)}
         ])
     # Add more shared history data for other people if needed to match the image
     # For now, let's assume some data for the "Viking Global Investors" overlap example
-    st.session_state.people.extend([
+    people.extend([
         {"id": str(uuid.uuid4()), "name": "Vivek M", "current_title": "Unknown", "current_company_name": "Shearlink Capital", "email": "", "linkedin_profile_url": "", "reference_list_url": ""},
         {"id": str(uuid.uuid4()), "name": "Melissa Livingston", "current_title": "Unknown", "current_company_name": "Tfg Asset Management", "email": "", "linkedin_profile_url": "", "reference_list_url": ""},
         {"id": str(uuid.uuid4()), "name": "Theodore Gleser", "current_title": "Unknown", "current_company_name": "D1 Capital Partners L.P.", "email": "", "linkedin_profile_url": "", "reference_list_url": ""},
@@ -80,13 +127,14 @@ if 'employments' not in st.session_state:
 
     # Add shared employments for the new people at Viking Global Investors
     viking_id = "Viking Global Investors" # Using company name as a pseudo-ID for simplicity
-    for person_data in st.session_state.people:
+    for person_data in people:
         if person_data['name'] in ["Vivek M", "Melissa Livingston", "Theodore Gleser", "Aaron Gelband",
                                    "David Schwartz", "Arnau Porto", "Yu Liu", "Hannah Clark",
                                    "Deanna Wagner", "Jeff Eberwein", "Grant Wonders", "Adrienne Mcateer-Santiago"]:
-            start_year = 2010 + hash(person_data['name']) % 5 # Randomize start year a bit
-            end_year = start_year + 3 + hash(person_data['name']) % 3 # Randomize duration
-            st.session_state.employments.append({
+            rng = random.Random(person_data['name']) # Seeded by name: the same years in every process
+            start_year = 2010 + rng.randrange(5) # Randomize start year a bit
+            end_year = start_year + 3 + rng.randrange(3) # Randomize duration
+            employments.append({
                 "id": str(uuid.uuid4()),
                 "person_id": person_data['id'],
                 "company_name": "Viking Global Investors",
@@ -95,57 +143,152 @@ if 'employments' not in st.session_state:
                 "end_date": date(end_year, 12, 31) if end_year < 2025 else None
             })
 
+    if SYNTHETIC_PEOPLE:
+        synthetic_people, synthetic_employments = generate_network(SYNTHETIC_PEOPLE, seed=SYNTHETIC_SEED)
+        people.extend(synthetic_people)
+        employments.extend(synthetic_employments)
+    return people, employments
+
+@st.cache_resource
+def load_sqlite_store(path):
+    """Opens the process-wide SQLite store, seeding it if the database is empty."""
+    store = SQLiteStore(path)
+    if not store.num_people():
+        store.add_many(*build_seed_data())
+    return store
+
+@st.cache_resource
+def load_shared_store():
+    """The process-wide in-memory dataset, and the lock every session's overlay takes to read or commit."""
+    return CompactStore(*build_seed_data()), threading.RLock()
+
+@st.cache_resource
+def load_export_cache(path):
+    """Export files of the process-wide SQLite store, shared like the store itself."""
+    return ExportCache(load_sqlite_store(path))
+
+@st.cache_resource
+def load_shared_export_cache():
+    """Export files of the process-wide in-memory dataset, read under its lock."""
+    return ExportCache(*load_shared_store())
+
+# --- Session State Initialization ---
+# Initialize core data structures in Streamlit's session state.
+# This data will persist as long as the user's browser session is active.
+if 'store' not in st.session_state:
+    if DATABASE_PATH:
+        # Shared by every session; only a reference is kept in session state
+        st.session_state.store = load_sqlite_store(DATABASE_PATH)
+    else:
+        # A private copy-on-write view of the shared columnar dataset (see overlay_store)
+        st.session_state.store = OverlayStore(*load_shared_store())
+
 if 'current_view' not in st.session_state:
-    st.session_state.current_view = 'list' # 'list' or 'details'
+    st.session_state.current_view = 'list' # 'list', 'details' or 'analytics'
 if 'selected_person_id' not in st.session_state:
     st.session_state.selected_person_id = None
 
 # --- SpaCy Model Loading ---
+# spaCy is imported and its model loaded on first use (or by the optional
+# warm-up at the end of the script), never as part of the first render.
+@st.cache_resource
+def startup_timings():
+    """Cold-start timings of this server process, in seconds, recorded by its first script run."""
+    return {}
+
+def _timed_load(timings):
+    started = time.perf_counter()
+    nlp_model = load_ner_model(SPACY_MODEL)
+    timings['nlp_load_s'] = round(time.perf_counter() - started, 3)
+    return nlp_model
+
 @st.cache_resource
 def load_spacy_model():
-    """Loads the English SpaCy NLP model, cached for efficiency."""
+    """Starts loading the NER-only SpaCy model in a background thread; returns its Future, one per process."""
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="spacy-load")
+    future = executor.submit(_timed_load, startup_timings())
+    executor.shutdown(wait=False) # The thread exits once the model is loaded
+    return future
+
+def get_nlp():
+    """Returns the SpaCy model, waiting for it to finish loading if needed."""
+    loading = load_spacy_model()
     try:
-        nlp_model = spacy.load("en_core_web_sm")
-        return nlp_model
-    except OSError:
-        st.error("SpaCy model 'en_core_web_sm' not found. Please install it by running:")
-        st.code("pip install spacy && python -m spacy download en_core_web_sm")
+        if loading.done():
+            return loading.result()
+        with st.spinner("Loading the NLP model..."), profiling.section("NLP model wait"):
+            return loading.result()
+    except (ImportError, OSError):
+        load_spacy_model.clear() # Retry on the next request, e.g. once the model is installed
+        st.error(f"SpaCy model '{SPACY_MODEL}' not found. Please install it by running:")
+        st.code(f"pip install spacy && python -m spacy download {SPACY_MODEL}")
         st.stop()
 
-nlp = load_spacy_model()
-
 # --- Helper Functions for Data Management ---
 
-def calculate_overlap_years(start1, end1, start2, end2):
-    """
-    Calculates the overlapping years between two date ranges.
-    Treats None as 'present' (up to current date).
-    """
-    today = date.today()
-    period1_end = end1 if end1 is not None else today
-    period2_end = end2 if end2 is not None else today
-
-    # Find the later of the two start dates
-    latest_start = max(start1, start2)
-    # Find the earlier of the two end dates
-    earliest_end = min(period1_end, period2_end)
-
-    overlap_days = (earliest_end - latest_start).days
-    if overlap_days <= 0:
-        return 0.0 # No overlap or invalid overlap
-    return round(overlap_days / 365.25, 2) # Account for leap years
-
+@profiling.counted
 def get_person_by_id(person_id):
     """Retrieves a person dictionary by their ID."""
-    return next((p for p in st.session_state.people if p['id'] == person_id), None)
+    return st.session_state.store.get_person(person_id)
 
+@profiling.counted
 def get_employments_by_person_id(person_id):
     """Retrieves a list of employment dictionaries for a given person ID."""
-    return [e for e in st.session_state.employments if e['person_id'] == person_id]
+    return st.session_state.store.employments_for(person_id)
+
+def add_person(person):
+    """Adds a person dictionary to the store."""
+    st.session_state.store.add_person(person)
+
+def add_employment(employment):
+    """Adds an employment dictionary to the store (and its company index)."""
+    st.session_state.store.add_employment(employment)
+
+def update_person(person_id, **fields):
+    """Updates fields (e.g. current title/company) of a stored person."""
+    st.session_state.store.update_person(person_id, **fields)
 
 def get_all_companies():
     """Returns a set of all unique company names from employment history."""
-    return set(e['company_name'] for e in st.session_state.employments)
+    return st.session_state.store.companies()
+
+def get_export_cache():
+    """Returns the lazily built, version-checked export files for the current store."""
+    if DATABASE_PATH:
+        return load_export_cache(DATABASE_PATH)
+    if not any(st.session_state.store.pending()):
+        # Nothing uncommitted: this session sees exactly the shared dataset, so it
+        # shares its files too (keyed by the shared data_version)
+        st.session_state.pop('export_cache', None)
+        return load_shared_export_cache()
+    if 'export_cache' not in st.session_state:
+        st.session_state.export_cache = ExportCache(st.session_state.store)
+    return st.session_state.export_cache
+
+def get_entity_resolver():
+    """Returns the fuzzy matcher over stored names and companies."""
+    return st.session_state.store.entity_resolver()
+
+def get_newsletter_matches(person_names, org_names):
+    """
+    Returns ({name: person matches}, {org: company match}) for the extracted
+    entities, resolved once per extraction and again only after a data write.
+    """
+    version = st.session_state.store.data_version()
+    cached = st.session_state.get('newsletter_matches')
+    if cached is None or cached[0] != version:
+        resolver = get_entity_resolver()
+        with profiling.section("entity resolution"):
+            cached = st.session_state.newsletter_matches = (
+                version,
+                {name: resolver.match_person(name) for name in person_names},
+                {org: resolver.match_company(org, limit=1) for org in org_names},
+            )
+    return cached[1], cached[2]
+
+def get_company_analytics():
+    """Returns the headcount timelines and stint index over all employments."""
+    return st.session_state.store.company_analytics()
 
 def go_to_details(person_id):
     """Sets the session state to view details of a specific person."""
@@ -157,41 +300,72 @@ def go_to_list():
     st.session_state.selected_person_id = None
     st.session_state.current_view = 'list'
 
+def go_to_analytics():
+    """Switches the main area to the company analytics view."""
+    st.session_state.selected_person_id = None
+    st.session_state.current_view = 'analytics'
+
 # --- UI Functions ---
 
+PAGE_SIZES = [25, 50, 100]
+
+@profiling.timed("person list")
 def display_person_list():
-    """Displays the main list of all people in the system."""
+    """Displays one page of the searchable list of people in the system."""
     st.header("All Professional Profiles")
 
-    if not st.session_state.people:
+    store = st.session_state.store
+    if not store.num_people():
         st.info("No professional profiles added yet. Use the form below to add one!")
         return
 
-    # Prepare data for display
-    people_data = []
-    for person in st.session_state.people:
-        people_data.append({
-            "Name": person['name'],
-            "Current Title": person['current_title'],
-            "Current Company": person['current_company_name'],
-            "ID": person['id'] # Hidden ID for internal use
-        })
-
-    df_people = pd.DataFrame(people_data)
-    df_display = df_people.drop(columns=["ID"]) # Don't show ID in the main table
-
-    st.dataframe(df_display, use_container_width=True)
+    name_col, company_col, title_col, size_col = st.columns([3, 3, 3, 1])
+    filters = {
+        "name": name_col.text_input("Name", key="filter_name", placeholder="e.g. dan sund"),
+        "current_company_name": company_col.text_input("Company", key="filter_company"),
+        "current_title": title_col.text_input("Title", key="filter_title"),
+    }
+    page_size = size_col.selectbox("Per page", PAGE_SIZES, index=1, key="page_size")
+
+    # Back to the first page whenever the filters or page size change
+    query = (tuple(filters.values()), page_size)
+    if st.session_state.get('list_query') != query:
+        st.session_state.list_query = query
+        st.session_state.list_page = 1
+
+    total, _ = store.search_people(limit=0, **filters)
+    if not total:
+        st.info("No profiles match these filters.")
+        return
+    num_pages = -(-total // page_size)
+    page = min(st.session_state.list_page, num_pages)
+    people = store.search_people(offset=(page - 1) * page_size, limit=page_size, **filters)[1]
+
+    df_people = pd.DataFrame({
+        "Name": [person['name'] for person in people],
+        "Current Title": [person['current_title'] for person in people],
+        "Current Company": [person['current_company_name'] for person in people],
+    })
+    # A fresh key after each selection, so returning to the list starts unselected
+    table_key = f"people_table_{st.session_state.get('table_generation', 0)}"
+    selection = st.dataframe(df_people, use_container_width=True, hide_index=True,
+                             on_select="rerun", selection_mode="single-row", key=table_key)
+    selected_rows = selection["selection"]["rows"]
+    if selected_rows:
+        st.session_state.table_generation = st.session_state.get('table_generation', 0) + 1
+        go_to_details(people[selected_rows[0]]['id'])
+        st.rerun()
 
-    st.markdown("---")
-    st.subheader("View Profile Details")
-    # Create buttons for each person to view their details
-    cols = st.columns(5) # Adjust columns for better layout
-    for i, person in enumerate(st.session_state.people):
-        with cols[i % 5]: # Distribute buttons across columns
-            if st.button(f"View {person['name']}", key=f"view_{person['id']}"):
-                go_to_details(person['id'])
-                st.rerun()
+    prev_col, info_col, next_col = st.columns([1, 4, 1])
+    if prev_col.button("◀ Previous", key="prev_page", disabled=page <= 1):
+        st.session_state.list_page = page - 1
+        st.rerun()
+    info_col.caption(f"Page {page} of {num_pages} · {total:,} matching profiles · select a row to view details")
+    if next_col.button("Next ▶", key="next_page", disabled=page >= num_pages):
+        st.session_state.list_page = page + 1
+        st.rerun()
 
+@profiling.timed("person details")
 def display_person_details(person_id):
     """Displays detailed information for a selected person."""
     person = get_person_by_id(person_id)
@@ -243,7 +417,7 @@ def display_person_details(person_id):
                 if new_end_date and new_end_date < new_start_date:
                     st.error("End Date cannot be before Start Date.")
                 else:
-                    st.session_state.employments.append({
+                    add_employment({
                         "id": str(uuid.uuid4()),
                         "person_id": person_id,
                         "company_name": new_company_name,
@@ -253,8 +427,7 @@ def display_person_details(person_id):
                     })
                     # Update current company/title if this is the most recent employment
                     if not new_end_date or new_end_date >= date.today():
-                        person['current_company_name'] = new_company_name
-                        person['current_title'] = new_title
+                        update_person(person_id, current_company_name=new_company_name, current_title=new_title)
                     st.success("Employment added successfully!")
                     st.rerun() # Rerun to update the display
 
@@ -266,65 +439,144 @@ def display_person_details(person_id):
     st.markdown("---")
     st.subheader("Shared Work History")
 
-    # This is the core logic for the "Shared Work History" section
+    # This is the core logic for the "Shared Work History" section. The store
+    # computes the overlaps for all of the person's stints in one batch.
     shared_history_data = []
-    
-    # Get all employments for the selected person
-    selected_person_employments = get_employments_by_person_id(person_id)
-
-    # Iterate through all other people
-    for other_person in st.session_state.people:
-        if other_person['id'] == person_id:
-            continue # Skip the selected person themselves
-
-        other_person_employments = get_employments_by_person_id(other_person['id'])
-        
-        # Find common companies
-        for selected_emp in selected_person_employments:
-            for other_emp in other_person_employments:
-                if selected_emp['company_name'] == other_emp['company_name']:
-                    overlap = calculate_overlap_years(
-                        selected_emp['start_date'], selected_emp['end_date'],
-                        other_emp['start_date'], other_emp['end_date']
-                    )
-                    if overlap > 0:
-                        shared_history_data.append({
-                            "Full Name": other_person['name'],
-                            "Contact": "📞🔗", # Placeholder for contact icons (as per image)
-                            "Overlap Company": selected_emp['company_name'],
-                            "Current Company": other_person['current_company_name'],
-                            "Overlap Years": overlap
-                        })
+    with profiling.section("shared history"):
+        for match in st.session_state.store.shared_history(person_id):
+            shared_history_data.append({
+                "Full Name": match['name'],
+                "Contact": "📞🔗", # Placeholder for contact icons (as per image)
+                "Overlap Company": match['company_name'],
+                "Current Company": match['current_company_name'],
+                "Overlap Years": match['overlap_years']
+            })
     
     if shared_history_data:
-        # Remove duplicates if any (e.g., if two people worked at the same company multiple times with overlap)
-        # Using a tuple of key fields for uniqueness
-        unique_shared_history = []
-        seen = set()
-        for entry in shared_history_data:
-            key = (entry["Full Name"], entry["Overlap Company"])
-            if key not in seen:
-                unique_shared_history.append(entry)
-                seen.add(key)
-        
-        # Sort by Overlap Years descending for better visibility
-        df_shared_history = pd.DataFrame(unique_shared_history).sort_values(by="Overlap Years", ascending=False)
+        # The store has already removed duplicate (name, company) pairs and sorted
+        # by Overlap Years descending, exactly as this table always was
+        df_shared_history = pd.DataFrame(shared_history_data)
         
         st.dataframe(df_shared_history, use_container_width=True)
     else:
         st.info("No shared work history found with other professionals in the system.")
 
+    # --- Network Connections ---
+    # Opt-in: reach and paths scan far more of the data than this profile's own rows.
+    st.markdown("---")
+    if st.toggle("Show network: strongest connections, reach and warm intro paths", key="show_network"):
+        display_network(person)
+
 
     st.markdown("---")
     if st.button("← Back to All Profiles"):
         go_to_list()
         st.rerun()
 
+def display_network(person):
+    """Displays firm-wide queries over the coworker graph (edge weight = summed overlap years)."""
+    person_id = person['id']
+    st.subheader("Strongest Connections")
+    with profiling.section("coworker graph"):
+        graph = st.session_state.store.coworker_graph()
+        strongest = graph.strongest_connections(person_id, k=10)
+    connections = []
+    for other_id, overlap in strongest:
+        other_person = get_person_by_id(other_id)
+        if other_person:
+            connections.append({
+                "Full Name": other_person['name'],
+                "Current Company": other_person['current_company_name'],
+                "Total Overlap Years": round(overlap, 2)
+            })
+    if connections:
+        st.dataframe(pd.DataFrame(connections), use_container_width=True)
+        with profiling.section("coworker graph"):
+            reach = graph.component_size(person_id) - 1
+        st.caption(f"{person['name']}'s network reaches {reach} other professionals.")
+    else:
+        st.info("No connections found with other professionals in the system.")
+
+    st.subheader("Warm Intro Path")
+    target_company = st.selectbox("Find a path to someone currently at", sorted(get_all_companies()),
+                                  index=None, key="warm_intro_company")
+    if target_company:
+        with profiling.section("coworker graph"):
+            path = graph.warm_intro_path(person_id, target_company)
+        if path is None:
+            st.info(f"No path found to anyone currently at {target_company}.")
+        elif len(path) == 1:
+            st.info(f"{person['name']} is currently at {target_company}.")
+        else:
+            names = [get_person_by_id(pid)['name'] for pid in path]
+            st.markdown(" → ".join(f"**{name}**" for name in names))
+
+WHO_WAS_THERE_ROWS = 200 # People listed per "who was there" query (all are counted)
+
+@profiling.timed("company analytics")
+def display_company_analytics():
+    """Displays headcount over time, who was at a company when, and where its alumni went."""
+    st.title("Company Analytics")
+    analytics = get_company_analytics()
+    if not len(analytics):
+        st.info("No employment history yet.")
+        return
+    companies = analytics.company_names() # Largest current headcount first
+    selected = st.multiselect("Companies", companies, default=companies[:3], max_selections=8,
+                              key="analytics_companies")
+    if not selected:
+        st.info("Select one or more companies.")
+        return
+
+    st.subheader("Headcount Over Time")
+    first_year, last_year = st.slider("Years", 1980, date.today().year, (date.today().year - 15, date.today().year),
+                                      key="analytics_years")
+    headcount = analytics.headcount_series(selected, date(first_year, 1, 1),
+                                           min(date(last_year, 12, 1), date.today()))
+    st.line_chart(headcount)
+
+    st.subheader("Who Was There")
+    company_col, date_col = st.columns([1, 1])
+    company = company_col.selectbox("Company", selected, key="analytics_who_company")
+    dates = date_col.date_input("On a date, or during a date range", value=(date.today(),),
+                                key="analytics_who_dates")
+    dates = dates if isinstance(dates, (tuple, list)) else (dates,)
+    if dates:
+        people = analytics.who_was_at(company, dates[0], dates[-1])
+        rows = []
+        for stint in people.head(WHO_WAS_THERE_ROWS).itertuples():
+            person = get_person_by_id(stint.person_id)
+            rows.append({
+                "Full Name": person['name'] if person else stint.person_id,
+                "Start Date": stint.start_date.date(),
+                "End Date": stint.end_date.date() if not pd.isna(stint.end_date) else None,
+                "Current Company": person['current_company_name'] if person else "",
+            })
+        period = f"on {dates[0]}" if dates[0] == dates[-1] else f"between {dates[0]} and {dates[-1]}"
+        st.caption(f"{len(people):,} {'person' if len(people) == 1 else 'people'} at {company} {period}"
+                   + (f" · showing the first {WHO_WAS_THERE_ROWS} by start date" if len(people) > WHO_WAS_THERE_ROWS else ""))
+        if rows:
+            st.dataframe(pd.DataFrame(rows), use_container_width=True)
+
+    st.subheader("Alumni Flow")
+    st.caption("Moves from each company (rows) to the next company in people's careers (columns), "
+               f"dated by the new role's start, {first_year}–{last_year}.")
+    st.dataframe(analytics.alumni_flow_matrix(selected, date(first_year, 1, 1), date(last_year, 12, 31)),
+                 use_container_width=True)
+    top_destinations = analytics.alumni_flow(selected, date(first_year, 1, 1), date(last_year, 12, 31)).head(10)
+    if not top_destinations.empty:
+        st.markdown("**Top destinations**")
+        st.dataframe(top_destinations.rename(columns={"from_company": "From", "to_company": "To", "people": "People"}),
+                     use_container_width=True, hide_index=True)
+
 # --- Main Application Logic ---
 st.sidebar.title("Navigation")
 if st.sidebar.button("All Profiles", key="nav_all_profiles"):
     go_to_list()
     st.rerun()
+if st.sidebar.button("Company Analytics", key="nav_company_analytics"):
+    go_to_analytics()
+    st.rerun()
 
 if st.session_state.current_view == 'list':
     display_person_list()
@@ -356,7 +608,7 @@ if st.session_state.current_view == 'list':
                     st.error("Initial Employment: End Date cannot be before Start Date.")
                 else:
                     new_person_id = str(uuid.uuid4())
-                    st.session_state.people.append({
+                    add_person({
                         "id": new_person_id,
                         "name": person_name,
                         "current_title": current_title,
@@ -365,7 +617,7 @@ if st.session_state.current_view == 'list':
                         "linkedin_profile_url": linkedin_url,
                         "reference_list_url": reference_url
                     })
-                    st.session_state.employments.append({
+                    add_employment({
                         "id": str(uuid.uuid4()),
                         "person_id": new_person_id,
                         "company_name": initial_company_name,
@@ -381,16 +633,46 @@ if st.session_state.current_view == 'list':
 elif st.session_state.current_view == 'details' and st.session_state.selected_person_id:
     display_person_details(st.session_state.selected_person_id)
 
+elif st.session_state.current_view == 'analytics':
+    display_company_analytics()
+
 # --- NLP Integration (Optional: For future "parsing" from newsletters, not directly for OWL system) ---
 st.sidebar.markdown("---")
-st.sidebar.subheader("NLP for Newsletter (Separate Feature)")
-uploaded_file = st.sidebar.file_uploader("Upload Newsletter .txt for NLP suggestions (Doesn't add to OWL data)", type="txt")
-
-if uploaded_file is not None:
-    file_contents = uploaded_file.read().decode("utf-8", errors="ignore")
-    doc = nlp(file_contents)
-    person_names = sorted(list(set([ent.text for ent in doc.ents if ent.label_ == "PERSON"])))
-    org_names = sorted(list(set([ent.text for ent in doc.ents if ent.label_ == "ORG"])))
+st.sidebar.subheader("NLP for Newsletters (Separate Feature)")
+newsletter_files = st.sidebar.file_uploader(
+    "Upload newsletter .txt files or .zip archives for NLP suggestions (Doesn't add to OWL data)",
+    type=["txt", "zip"], accept_multiple_files=True, key="newsletter_files"
+)
+
+if newsletter_files and st.sidebar.button("Extract Names & Organizations", key="extract_newsletters"):
+    # Runs only on request (not on every rerun) and streams progress as batches finish
+    total_docs = count_newsletter_documents(newsletter_files)
+    progress = st.sidebar.progress(0.0, text=f"0/{total_docs} documents")
+    latest = st.sidebar.empty()
+    newsletter_results = []
+    started = time.perf_counter()
+    entity_stream = extract_entities(
+        get_nlp(), iter_newsletter_texts(newsletter_files), n_process=default_process_count(total_docs)
+    )
+    with profiling.section("newsletter extraction"):
+        for done, (doc_name, entities) in enumerate(entity_stream, start=1):
+            # Entity lists are kept as lists (names like "J. Goldman & CO, L.P." contain commas)
+            newsletter_results.append({
+                "Document": doc_name,
+                "Names": entities["PERSON"],
+                "Organizations": entities["ORG"]
+            })
+            docs_per_second = done / max(time.perf_counter() - started, 1e-9)
+            progress.progress(done / max(total_docs, 1), text=f"{done}/{total_docs} documents · {docs_per_second:.1f} docs/s")
+            latest.caption(f"Latest: {doc_name}")
+    latest.empty()
+    st.session_state.newsletter_results = newsletter_results
+    st.session_state.pop('newsletter_matches', None) # Resolved again for the new results
+
+if newsletter_files and st.session_state.get('newsletter_results'):
+    newsletter_results = st.session_state.newsletter_results
+    person_names = sorted(set(name for row in newsletter_results for name in row["Names"] if name))
+    org_names = sorted(set(org for row in newsletter_results for org in row["Organizations"] if org))
 
     st.sidebar.markdown("**Suggested Names:**")
     if person_names:
@@ -403,47 +685,204 @@ if uploaded_file is not None:
         st.sidebar.write(", ".join(org_names))
     else:
         st.sidebar.write("No organizations found.")
-    st.sidebar.info("These are just suggestions from the newsletter. Add them manually to the system via the forms.")
+    with st.sidebar.expander(f"Per-document results ({len(newsletter_results)})"):
+        st.dataframe(pd.DataFrame([{**row, "Names": ", ".join(row["Names"]),
+                                    "Organizations": ", ".join(row["Organizations"])}
+                                   for row in newsletter_results]), use_container_width=True)
 
+    # --- Resolve suggestions against existing profiles and companies ---
+    if person_names:
+        st.sidebar.markdown("**Resolve a Suggestion:**")
+        person_matches, org_matches = get_newsletter_matches(person_names, org_names)
+
+        def describe_name(name):
+            matches = person_matches[name]
+            return f"{name} → {matches[0][1]} ({matches[0][2]:.0%})" if matches else f"{name} → new"
+
+        def describe_org(org):
+            if org is None:
+                return "No organization"
+            matches = org_matches[org]
+            return f"{org} → {matches[0][0]}" if matches else f"{org} (new company)"
+
+        suggested_name = st.sidebar.selectbox("Extracted name", person_names, format_func=describe_name,
+                                              key="resolve_name")
+        candidates = person_matches[suggested_name]
+        new_profile = "new"
+        target = st.sidebar.selectbox(
+            "Match to", [candidate[0] for candidate in candidates] + [new_profile],
+            format_func=lambda key: "Create new profile" if key == new_profile else
+                next(f"{name} ({score:.0%})" for person_id, name, score in candidates if person_id == key),
+            key="resolve_target"
+        )
+        suggested_org = st.sidebar.selectbox("Organization", [None] + org_names, format_func=describe_org,
+                                             index=1 if org_names else 0, key="resolve_org")
+        company_name = (org_matches[suggested_org][0][0] if org_matches[suggested_org] else suggested_org) \
+            if suggested_org else ""
+        title = st.sidebar.text_input("Title", key="resolve_title")
+
+        if target == new_profile:
+            if st.sidebar.button(f"Create profile for {suggested_name}", key="resolve_create"):
+                new_person_id = str(uuid.uuid4())
+                add_person({
+                    "id": new_person_id,
+                    "name": suggested_name,
+                    "current_title": title,
+                    "current_company_name": company_name,
+                    "email": "",
+                    "linkedin_profile_url": "",
+                    "reference_list_url": ""
+                })
+                if company_name and title:
+                    add_employment({
+                        "id": str(uuid.uuid4()),
+                        "person_id": new_person_id,
+                        "company_name": company_name,
+                        "title": title,
+                        "start_date": date.today(),
+                        "end_date": None
+                    })
+                st.session_state.resolve_message = f"Created a profile for {suggested_name}."
+                st.rerun()
+        elif st.sidebar.button("Add employment (starting today)", key="resolve_add_employment",
+                               disabled=not (company_name and title)):
+            add_employment({
+                "id": str(uuid.uuid4()),
+                "person_id": target,
+                "company_name": company_name,
+                "title": title,
+                "start_date": date.today(),
+                "end_date": None
+            })
+            update_person(target, current_title=title, current_company_name=company_name)
+            st.session_state.resolve_message = f"Added {title} at {company_name} to {get_person_by_id(target)['name']}."
+            st.rerun()
+        if st.session_state.get('resolve_message'):
+            st.sidebar.success(st.session_state.pop('resolve_message'))
 
-# --- Export Data to CSV ---
-st.sidebar.markdown("---")
-st.sidebar.subheader("Export Data")
 
-if st.session_state.people:
-    df_export_people = pd.DataFrame([p for p in st.session_state.people])
-    df_export_people['email'] = df_export_people['email'].apply(lambda x: x if x else '')
-    df_export_people['linkedin_profile_url'] = df_export_people['linkedin_profile_url'].apply(lambda x: x if x else '')
-    df_export_people['reference_list_url'] = df_export_people['reference_list_url'].apply(lambda x: x if x else '')
-    csv_people = df_export_people.to_csv(index=False).encode('utf-8')
-    st.sidebar.download_button(
-        label="Download All People Data (CSV)",
-        data=csv_people,
-        file_name="professional_profiles.csv",
-        mime="text/csv",
-        help="Downloads all professional profiles data."
-    )
+# --- Bulk Import from CSV ---
+# Accepts the same formats as the export below; files are streamed in chunks.
+st.sidebar.markdown("---")
+st.sidebar.subheader("Bulk Import")
+people_csv = st.sidebar.file_uploader("People CSV (professional_profiles.csv format)", type="csv", key="import_people_csv")
+employments_csv = st.sidebar.file_uploader("Employment CSV (employment_history.csv format)", type="csv", key="import_employments_csv")
 
-if st.session_state.employments:
-    df_export_employments = pd.DataFrame([
-        {
-            "person_id": e['person_id'],
-            "company_name": e['company_name'],
-            "title": e['title'],
-            "start_date": e['start_date'].strftime("%Y-%m-%d"),
-            "end_date": e['end_date'].strftime("%Y-%m-%d") if e['end_date'] else "Present"
-        }
-        for e in st.session_state.employments
-    ])
-    csv_employments = df_export_employments.to_csv(index=False).encode('utf-8')
-    st.sidebar.download_button(
-        label="Download All Employment History (CSV)",
-        data=csv_employments,
-        file_name="employment_history.csv",
-        mime="text/csv",
-        help="Downloads all employment history data."
-    )
+if st.sidebar.button("Import CSV Data", key="import_csv_button", disabled=not (people_csv or employments_csv)):
+    import_reports = []
+    try:
+        # People first, so employments can reference them
+        with profiling.section("bulk import"):
+            if people_csv is not None:
+                import_reports.append(("People", import_people_csv(st.session_state.store, people_csv)))
+            if employments_csv is not None:
+                import_reports.append(("Employments", import_employments_csv(st.session_state.store, employments_csv)))
+    except ValueError as e:
+        st.sidebar.error(f"Import failed: {e}")
+    else:
+        st.session_state.import_reports = import_reports
+        st.rerun() # Rerun so the main view shows the imported data
+
+for label, report in st.session_state.get('import_reports', []):
+    st.sidebar.success(f"{label}: {report.summary()}")
+
+# --- Session Changes ---
+# In-memory mode: this session's writes stay private until committed.
+if isinstance(st.session_state.store, OverlayStore):
+    st.sidebar.markdown("---")
+    st.sidebar.subheader("Session Changes")
+    new_people, new_employments, updated_people = st.session_state.store.pending()
+    if new_people or new_employments or updated_people:
+        st.sidebar.write(f"Uncommitted: {new_people} new people, {new_employments} new employments, "
+                         f"{updated_people} updated profiles.")
+        commit_col, discard_col = st.sidebar.columns(2)
+        if commit_col.button("Commit to shared dataset", key="commit_session"):
+            try:
+                st.session_state.store.commit()
+            except ValueError as e:
+                st.sidebar.error(f"Commit failed: {e}")
+            else:
+                st.rerun()
+        if discard_col.button("Discard", key="discard_session"):
+            st.session_state.store.discard()
+            st.rerun()
+    else:
+        st.sidebar.write("No uncommitted changes.")
 
+# --- Export Data ---
 st.sidebar.markdown("---")
-st.sidebar.info("Data is stored in-memory for the session. It will reset if the app restarts.")
+st.sidebar.subheader("Export Data")
 
+export_cache = get_export_cache()
+export_datasets = [
+    ("people", "People Data", "Downloads all professional profiles data.", st.session_state.store.num_people()),
+    ("employments", "Employment History", "Downloads all employment history data.",
+     st.session_state.store.num_employments()),
+]
+export_format = st.sidebar.radio("Format", list(EXPORT_FORMATS), format_func=str.upper, horizontal=True,
+                                 key="export_format")
+extension, mime = EXPORT_FORMATS[export_format]
+for dataset, label, help_text, count in export_datasets:
+    if not count:
+        continue
+    # Files are only built on request, and reused until the data changes
+    data = export_cache.cached(dataset, export_format)
+    if data is None and st.sidebar.button(f"Prepare {label} ({export_format.upper()})",
+                                          key=f"prepare_{dataset}_{export_format}"):
+        with profiling.section("export build"):
+            data = export_cache.get(dataset, export_format)
+    if data is not None:
+        st.sidebar.download_button(
+            label=f"Download {label} ({export_format.upper()})",
+            data=data,
+            file_name=f"{EXPORT_FILE_NAMES[dataset]}.{extension}",
+            mime=mime,
+            help=help_text,
+            key=f"download_{dataset}_{export_format}"
+        )
+
+st.sidebar.markdown("---")
+if DATABASE_PATH:
+    st.sidebar.info(f"Data is stored in the SQLite database at {DATABASE_PATH} and shared by all sessions.")
+else:
+    st.sidebar.info("Data is stored in-memory and shared by all sessions once committed. "
+                    "It will reset if the app restarts.")
+
+# --- Startup Timing ---
+# The first run in a server process pays the imports; report them and the
+# time to the first complete page once, to track cold starts across replicas.
+timings = startup_timings()
+if 'first_paint_s' not in timings:
+    timings['imports_s'] = round(IMPORTS_DONE - SCRIPT_STARTED, 3)
+    timings['first_paint_s'] = round(time.perf_counter() - SCRIPT_STARTED, 3)
+    print(json.dumps({"event": "startup", **timings}), file=sys.stderr)
+st.sidebar.caption(
+    f"Cold start: imports {timings['imports_s']:.2f} s, first page {timings['first_paint_s']:.2f} s"
+    + (f", NLP model {timings['nlp_load_s']:.2f} s" if 'nlp_load_s' in timings else "")
+)
+if WARM_NLP:
+    load_spacy_model() # Returns at once; the model loads in the background
+
+# --- Rerun Profile Panel ---
+if PROFILE:
+    rerun_profile = profiling.stop()
+    st.session_state.pop('rerun_profile', None)
+    recent = st.session_state.setdefault('recent_profiles', [])
+    recent.append(rerun_profile)
+    del recent[:-PROFILE_HISTORY]
+    if PROFILE_LOG:
+        profiling.append_jsonl(PROFILE_LOG, rerun_profile)
+
+    with st.sidebar.expander("Debug: rerun profile", expanded=True):
+        st.markdown(f"**This rerun:** {rerun_profile.total * 1000:.1f} ms ({rerun_profile.label} view)")
+        st.dataframe(pd.DataFrame(
+            [(name, seconds * 1000, runs) for name, (seconds, runs) in rerun_profile.sections.items()],
+            columns=["Section", "ms", "Runs"]
+        ), hide_index=True, use_container_width=True)
+        if rerun_profile.calls:
+            st.dataframe(pd.DataFrame(sorted(rerun_profile.calls.items()), columns=["Helper", "Calls"]),
+                         hide_index=True, use_container_width=True)
+        st.markdown(f"**Last {len(recent)} reruns (ms):**")
+        st.bar_chart(pd.DataFrame({"ms": [profile.total * 1000 for profile in recent]}))
+        if any(profile.interrupted for profile in recent):
+            st.caption("Reruns ended early by st.rerun() are timed up to their last section.")
@@ -0,0 +1,1003 @@
+"""
+Headless benchmarks for the TalentNetwork data layer.
+
+Run from the repository root, e.g.:
+
+    python benchmark.py shared-history --sizes 10000 100000 1000000
+"""
+import argparse
+import difflib
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from bulk_import import import_employments_csv, import_people_csv
+from compact_store import CompactStore
+from entity_matcher import NameMatcher, normalize_person_name
+from exports import ExportCache, employments_frame, people_frame, to_csv_bytes
+from newsletter_nlp import SPACY_MODEL
+from overlap import OverlapEngine, calculate_overlap_years, normalize_company_name, overlap_years
+from overlay_store import OverlayStore
+from sqlite_store import SQLiteStore
+from synthetic_data import NETWORK_TODAY, generate_network, random_name
+
+
+# --- Synthetic Data ---
+
+def make_dataset(num_employments, seed=0):
+    """
+    Builds a synthetic (people, employments) pair with num_employments
+    stints: generate_network() for num_employments / 2 people, with about
+    two stints each and dates relative to NETWORK_TODAY, so every run and
+    every commit measures the same data.
+    """
+    people, employments = generate_network(max(num_employments // 2, 1), seed=seed, mean_stints=2.5,
+                                           today=NETWORK_TODAY)
+    return people, employments[:num_employments]
+
+
+# --- Shared Work History ---
+
+def bench_shared_history(args):
+    print(f"{'employments':>12} {'build (s)':>10} {'store (ms)':>11} {'original (ms)':>14} {'speedup':>9}")
+    for size in args.sizes:
+        people, employments = make_dataset(size, seed=args.seed)
+        started = time.perf_counter()
+        store = CompactStore(people, employments)
+        build_seconds = time.perf_counter() - started
+
+        # Distinct people, so every lookup misses the cache as a first view would
+        sample = random.Random(args.seed).sample(people, min(args.queries, len(people)))
+        started = time.perf_counter()
+        for person in sample:
+            store.shared_history(person['id'])
+        store_ms = (time.perf_counter() - started) * 1000 / len(sample)
+
+        original = "skipped"
+        speedup = ""
+        if size <= args.legacy_limit:
+            by_person = {}
+            for employment in employments:
+                by_person.setdefault(employment['person_id'], []).append(employment)
+            person_id = sample[0]['id']
+            started = time.perf_counter()
+            expected = legacy_shared_history_table(people, by_person, person_id)
+            original_ms = (time.perf_counter() - started) * 1000
+            result = pd.DataFrame(store.shared_history(person_id), columns=expected.columns)
+            pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+            original = f"{original_ms:.1f}"
+            speedup = f"{original_ms / max(store_ms, 1e-6):.0f}x"
+        print(f"{size:>12} {build_seconds:>10.2f} {store_ms:>11.3f} {original:>14} {speedup:>9}")
+
+
+# --- Batched Overlap Engine ---
+
+def make_alumni_dataset(num_alumni, seed=0, company="Viking Global Investors"):
+    """
+    One large company with `num_alumni` stints plus a selected person with two
+    stints there. Every fifth alumnus comes back for a second stint (recorded
+    after everyone's first, so often out of date order), names repeat, and
+    some stints spell the company in lower case, which the original scan
+    treats as another company. Stints still running at NETWORK_TODAY are open-ended.
+    """
+    rng = random.Random(seed)
+    first_day = date(1995, 1, 1).toordinal()
+    people = [{"id": f"p{i}", "name": f"Alumnus {rng.randrange(num_alumni)}", "current_company_name": ""}
+              for i in range(num_alumni)]
+    people.append({"id": "selected", "name": "Selected Person", "current_company_name": company})
+    employments = []
+    for i in list(range(num_alumni)) + list(range(0, num_alumni, 5)):
+        start = date.fromordinal(first_day + rng.randrange(365 * 28))
+        end = start + timedelta(days=rng.randrange(90, 365 * 10))
+        company_name = company if rng.random() < 0.95 else company.lower()
+        employments.append({"id": f"e{len(employments)}", "person_id": f"p{i}", "company_name": company_name,
+                            "title": "Analyst", "start_date": start, "end_date": end if end < NETWORK_TODAY else None})
+    employments.append({"id": "s1", "person_id": "selected", "company_name": company, "title": "Analyst",
+                        "start_date": date(2004, 6, 1), "end_date": date(2009, 12, 31)})
+    employments.append({"id": "s2", "person_id": "selected", "company_name": company, "title": "Partner",
+                        "start_date": date(2012, 1, 1), "end_date": None})
+    return people, employments
+
+
+def legacy_shared_history_table(people, employments_by_person, person_id):
+    """
+    The Shared Work History table exactly as the original app.py built it (all
+    pairs, dedup, sort), with employments_by_person standing in for its list
+    scan, as columns person_id, name, company_name and overlap_years.
+    """
+    shared_history_data = []
+    selected_person_employments = employments_by_person.get(person_id, [])
+    for other_person in people:
+        if other_person['id'] == person_id:
+            continue
+        other_person_employments = employments_by_person.get(other_person['id'], [])
+        for selected_emp in selected_person_employments:
+            for other_emp in other_person_employments:
+                if selected_emp['company_name'] == other_emp['company_name']:
+                    overlap = calculate_overlap_years(
+                        selected_emp['start_date'], selected_emp['end_date'],
+                        other_emp['start_date'], other_emp['end_date']
+                    )
+                    if overlap > 0:
+                        shared_history_data.append({"person_id": other_person['id'], "name": other_person['name'],
+                                                    "company_name": selected_emp['company_name'],
+                                                    "overlap_years": overlap})
+    unique_shared_history = []
+    seen = set()
+    for entry in shared_history_data:
+        key = (entry["name"], entry["company_name"])
+        if key not in seen:
+            unique_shared_history.append(entry)
+            seen.add(key)
+    table = pd.DataFrame(unique_shared_history, columns=["person_id", "name", "company_name", "overlap_years"])
+    return table.sort_values(by="overlap_years", ascending=False).reset_index(drop=True)
+
+
+def bench_overlap(args):
+    print(f"{'alumni':>8} {'rows':>8} {'original (ms)':>14} {'engine (ms)':>12} {'speedup':>8}")
+    for size in args.sizes:
+        people, employments = make_alumni_dataset(size, seed=args.seed)
+        by_person = {}
+        for employment in employments:
+            by_person.setdefault(employment['person_id'], []).append(employment)
+        engine = OverlapEngine()
+        for person in people:
+            engine.add_person(person['id'], person['name'])
+        for employment in employments:
+            engine.add_employment(employment)
+
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            expected = legacy_shared_history_table(people, by_person, "selected")
+        original_ms = (time.perf_counter() - started) * 1000 / args.repeat
+
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            result = engine.shared_history("selected")
+        engine_ms = (time.perf_counter() - started) * 1000 / args.repeat
+
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+        print(f"{size:>8} {len(result):>8} {original_ms:>14.2f} {engine_ms:>12.2f} {original_ms / engine_ms:>7.1f}x")
+
+
+# --- Coworker Graph ---
+
+def bench_graph(args):
+    print(f"{'people':>10} {'employments':>12} {'components (s)':>15} {'add (ms)':>9} {'top-k (ms)':>11} "
+          f"{'path, first (ms)':>17} {'path (ms)':>10} {'component (us)':>15}")
+    for size in args.people:
+        people, employments = generate_network(size, seed=args.seed, today=SUITE_TODAY)
+        held_back = employments[-args.queries:]
+        store = CompactStore(people, employments[:-args.queries])
+        graph = store.coworker_graph()
+        started = time.perf_counter()
+        graph.component_size(people[0]['id'])  # builds the union-find
+        components_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for employment in held_back:
+            store.add_employment(employment)
+        add_ms = (time.perf_counter() - started) * 1000 / len(held_back)
+
+        rng = random.Random(args.seed)
+        sample = [p['id'] for p in rng.sample(people, min(args.queries, len(people)))]
+        companies = [e['company_name'] for e in rng.sample(employments, len(sample))]
+
+        started = time.perf_counter()
+        for person_id in sample:
+            graph.strongest_connections(person_id, k=10)
+        top_k_ms = (time.perf_counter() - started) * 1000 / len(sample)
+
+        started = time.perf_counter()
+        graph.warm_intro_path(sample[0], companies[0])  # builds the stint lists
+        path_first_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        for person_id, company in zip(sample, companies):
+            graph.warm_intro_path(person_id, company)
+        path_ms = (time.perf_counter() - started) * 1000 / len(sample)
+
+        started = time.perf_counter()
+        for person_id in sample:
+            graph.component_size(person_id)
+        component_us = (time.perf_counter() - started) * 1e6 / len(sample)
+        print(f"{size:>10} {len(employments):>12} {components_seconds:>15.2f} {add_ms:>9.3f} {top_k_ms:>11.3f} "
+              f"{path_first_ms:>17.1f} {path_ms:>10.3f} {component_us:>15.2f}")
+
+
+# --- Bulk Import ---
+
+def write_export_csvs(directory, num_employments, seed=0, chunk=100_000):
+    """
+    Writes professional_profiles.csv / employment_history.csv in the app's export
+    format, chunk by chunk; stints still running at NETWORK_TODAY are "Present".
+    """
+    rng = random.Random(seed)
+    num_people = max(num_employments // 2, 1)
+    people_path = os.path.join(directory, "professional_profiles.csv")
+    employments_path = os.path.join(directory, "employment_history.csv")
+    with open(people_path, "w") as f:
+        f.write("id,name,current_title,current_company_name,email,linkedin_profile_url,reference_list_url\n")
+        for i in range(num_people):
+            f.write(f"p{i},Person {i},Analyst,Company {i % 997},,,\n")
+    first_day = date(1990, 1, 1).toordinal()
+    with open(employments_path, "w") as f:
+        f.write("person_id,company_name,title,start_date,end_date\n")
+        for offset in range(0, num_employments, chunk):
+            lines = []
+            for i in range(offset, min(offset + chunk, num_employments)):
+                start = date.fromordinal(first_day + rng.randrange(365 * 34))
+                end = start + timedelta(days=rng.randrange(180, 365 * 8))
+                end_text = end.isoformat() if end < NETWORK_TODAY else "Present"
+                lines.append(f"p{i % num_people},Company {rng.randrange(num_employments // 50 + 1)},Analyst,"
+                             f"{start.isoformat()},{end_text}\n")
+            f.writelines(lines)
+    return people_path, employments_path
+
+
+def bench_import(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        people_path, employments_path = write_export_csvs(tmp, args.rows, seed=args.seed)
+        store = SQLiteStore(os.path.join(tmp, "import.db"))
+        for label, importer, path in (("people", import_people_csv, people_path),
+                                      ("employments", import_employments_csv, employments_path)):
+            report = importer(store, path, chunksize=args.chunksize, trace_memory=args.trace_memory)
+            print(f"{label:>12}: {report.summary()} in {report.seconds:.1f} s")
+
+
+# --- Person / Employment Lookups ---
+
+def bench_lookups(args):
+    print(f"{'employments':>12} {'store (us)':>11} {'list scan (us)':>15}")
+    for size in args.sizes:
+        people, employments = make_dataset(size, seed=args.seed)
+        store = CompactStore(people, employments)
+        sample = [p['id'] for p in random.Random(args.seed).sample(people, min(args.queries, len(people)))]
+
+        started = time.perf_counter()
+        for person_id in sample:
+            store.get_person(person_id)
+            store.employments_for(person_id)
+        store_us = (time.perf_counter() - started) * 1e6 / len(sample)
+
+        scan = "skipped"
+        if size <= args.legacy_limit:
+            scan_sample = sample[:10]
+            started = time.perf_counter()
+            for person_id in scan_sample:
+                next((p for p in people if p['id'] == person_id), None)
+                [e for e in employments if e['person_id'] == person_id]
+            scan = f"{(time.perf_counter() - started) * 1e6 / len(scan_sample):.1f}"
+        print(f"{size:>12} {store_us:>11.2f} {scan:>15}")
+
+
+# --- SQLite Backend ---
+
+def bench_sqlite(args):
+    print(f"{'employments':>12} {'load (s)':>9} {'open (ms)':>10} {'lookup (us)':>12} {'shared (ms)':>12} {'memory (ms)':>12}")
+    for size in args.sizes:
+        people, employments = make_dataset(size, seed=args.seed)
+        memory_store = CompactStore(people, employments)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench.db")
+            started = time.perf_counter()
+            SQLiteStore(path, people, employments)
+            load_seconds = time.perf_counter() - started
+
+            # Opening an existing database is what a new server process pays
+            started = time.perf_counter()
+            store = SQLiteStore(path, pool_size=1)
+            open_ms = (time.perf_counter() - started) * 1000
+
+            sample = [p['id'] for p in random.Random(args.seed).sample(people, min(args.queries, len(people)))]
+            started = time.perf_counter()
+            for person_id in sample:
+                store.get_person(person_id)
+                store.employments_for(person_id)
+            lookup_us = (time.perf_counter() - started) * 1e6 / len(sample)
+
+            started = time.perf_counter()
+            sqlite_rows = [store.shared_history(person_id) for person_id in sample]
+            shared_ms = (time.perf_counter() - started) * 1000 / len(sample)
+
+            started = time.perf_counter()
+            memory_rows = [memory_store.shared_history(person_id) for person_id in sample]
+            memory_ms = (time.perf_counter() - started) * 1000 / len(sample)
+            assert sqlite_rows == memory_rows, "SQLite shared history disagrees with the in-memory store"
+        print(f"{size:>12} {load_seconds:>9.2f} {open_ms:>10.2f} {lookup_us:>12.1f} {shared_ms:>12.3f} {memory_ms:>12.3f}")
+
+
+# --- Shared History Cache ---
+
+def _by_person(employments):
+    by_person = {}
+    for employment in employments:
+        by_person.setdefault(employment['person_id'], []).append(employment)
+    return by_person
+
+
+def _assert_original(rows, people, by_person, person_id, label):
+    """Asserts that Shared Work History rows equal the original table over people and by_person."""
+    expected = legacy_shared_history_table(people, by_person, person_id)
+    pd.testing.assert_frame_equal(pd.DataFrame(rows, columns=expected.columns), expected, check_dtype=False,
+                                  obj=f"{label} shared history of {person_id}")
+
+
+def _timed_lookups(store, person_ids):
+    """Returns (ms per lookup, rows by person id) for one shared_history() call per person."""
+    started = time.perf_counter()
+    rows = {person_id: store.shared_history(person_id) for person_id in person_ids}
+    return (time.perf_counter() - started) * 1000 / len(person_ids), rows
+
+
+def _newcomer(rng, name, stint):
+    """A new person with an ongoing stint at stint's company from its start, so the two overlap."""
+    person = {"id": str(uuid.UUID(int=rng.getrandbits(128), version=4)), "name": name, "current_title": "Analyst",
+              "current_company_name": stint['company_name'], "email": "", "linkedin_profile_url": "",
+              "reference_list_url": ""}
+    return person, _joining(rng, person['id'], stint)
+
+
+def _joining(rng, person_id, stint):
+    return {"id": str(uuid.UUID(int=rng.getrandbits(128), version=4)), "person_id": person_id,
+            "company_name": stint['company_name'], "title": "Analyst", "start_date": stint['start_date'],
+            "end_date": None}
+
+
+def check_store_cache(store, people, employments, sample, rng, label):
+    """
+    Checks a store's shared-history cache (CompactStore or SQLiteStore,
+    holding people and employments) against the original table: first
+    lookups miss and cached ones hit; a new employment invalidates exactly
+    the people at its company; an entry counting up to today is not reused
+    the next day, while one without ongoing stints is; and a result computed
+    before a write is not cached after it. Returns the ms per first,
+    cached and after-write lookup.
+    """
+    people, by_person = list(people), _by_person(employments)
+    cache = store.shared_history_cache
+
+    def lookups(hits, misses, phase):
+        before = cache.hits, cache.misses
+        ms, rows = _timed_lookups(store, sample)
+        assert (cache.hits - before[0], cache.misses - before[1]) == (hits, misses), \
+            f"{label} {phase}: expected {hits} hits and {misses} misses"
+        for person_id in sample:
+            _assert_original(rows[person_id], people, by_person, person_id, f"{label} {phase}")
+        return ms
+
+    first_ms = lookups(0, len(sample), "first lookups")
+    cached_ms = lookups(len(sample), 0, "cached lookups")
+
+    # Joining the first person's first company invalidates everyone with a stint there
+    stint = by_person[sample[0]][0]
+    person, employment = _newcomer(rng, "Cache Newcomer", stint)
+    store.add_many(people=[person], employments=[employment])
+    people.append(person)
+    by_person[person['id']] = [employment]
+    company = normalize_company_name(stint['company_name'])
+    at_company = sum(1 for person_id in sample
+                     if any(normalize_company_name(e['company_name']) == company for e in by_person[person_id]))
+    after_write_ms = lookups(len(sample) - at_company, at_company, "lookups after a write")
+
+    # Entries are valid for the day they were computed on, unless no stint is ongoing
+    today = date.today()
+    tomorrow = today + timedelta(days=1)
+    ongoing = next(person_id for person_id in sample if any(e['end_date'] is None for e in by_person[person_id]))
+    assert cache.get(ongoing, tomorrow) is None, f"{label}: a result counting up to today was reused the next day"
+    ended = next((person_id for person_id, stints in by_person.items()
+                  if all(e['end_date'] is not None and e['end_date'] <= today for e in stints)), None)
+    if ended is not None:
+        _assert_original(store.shared_history(ended), people, by_person, ended, f"{label} ended stints")
+        assert cache.get(ended, tomorrow) is not None, f"{label}: a result without ongoing stints expired"
+
+    # A result computed before a write (by another thread) must not be cached after it
+    person_id = sample[-1]
+    stale = store.shared_history(person_id)
+    generation = cache.generation()
+    stint = by_person[person_id][0]
+    person, employment = _newcomer(rng, "Cache Latecomer", stint)
+    store.add_many(people=[person], employments=[employment])
+    people.append(person)
+    by_person[person['id']] = [employment]
+    stints = [(e['company_name'], e['start_date'], e['end_date']) for e in by_person[person_id]]
+    cache.put(person_id, stale, stints, today, generation)
+    assert cache.get(person_id, today) is None, f"{label}: a result computed before a write was cached"
+    _assert_original(store.shared_history(person_id), people, by_person, person_id, f"{label} after the race")
+    return first_ms, cached_ms, after_write_ms
+
+
+def check_overlay_cache(people, employments, sample, rng):
+    """
+    Checks OverlayStore.shared_history against the original table over the
+    base plus the session's writes: people at none of the overlay's companies
+    are served from the base store's cache; others (new people, and base
+    people with overlay stints, whose base stints come first) are merged and
+    cached in the overlay; after commit the base serves the new data; and
+    another session's commit invalidates the overlay's entries. Returns the
+    ms of the first merged lookup, a cached one and one after another
+    session's commit.
+    """
+    lock = threading.RLock()
+    base = CompactStore(people, employments)
+    overlay = OverlayStore(base, lock)
+    base_people, base_by_person = list(people), _by_person(employments)
+    committed, pending, by_person = list(people), [], _by_person(employments)
+
+    def write(session, person, employment):
+        """Adds a stint (and the new person, if given) to a session and to the expected data."""
+        if person is not None:
+            session.add_person(person)
+            # The session's view lists committed people first, then its own new people
+            (pending if session is overlay else committed).append(person)
+        session.add_employment(employment)
+        by_person.setdefault(employment['person_id'], []).append(employment)
+
+    def assert_original(rows, person_id, label):
+        _assert_original(rows, committed + pending, by_person, person_id, label)
+
+    # A newcomer at the first person's first company, and a second stint there
+    # for one of their coworkers (the base stint is listed first, so it wins the dedup)
+    person_id = sample[0]
+    stint = base_by_person[person_id][0]
+    coworkers = legacy_shared_history_table(base_people, base_by_person, person_id)
+    coworkers = coworkers[coworkers['company_name'] == stint['company_name']]['person_id'].tolist()
+    newcomer, employment = _newcomer(rng, "Overlay Newcomer", stint)
+    write(overlay, newcomer, employment)
+    for coworker in coworkers[:1]:
+        write(overlay, None, _joining(rng, coworker, stint))
+
+    company = normalize_company_name(stint['company_name'])
+    untouched = next(other for other in sample[1:] if other not in coworkers
+                     and all(normalize_company_name(e['company_name']) != company for e in base_by_person[other]))
+    base.shared_history(untouched)
+    hits, misses = base.shared_history_cache.hits, overlay.shared_history_cache.misses
+    assert_original(overlay.shared_history(untouched), untouched, "overlay fast path")
+    assert (base.shared_history_cache.hits, overlay.shared_history_cache.misses) == (hits + 1, misses), \
+        "overlay: a person at none of its companies was not served from the base cache"
+
+    started = time.perf_counter()
+    rows = overlay.shared_history(person_id)
+    first_ms = (time.perf_counter() - started) * 1000
+    assert_original(rows, person_id, "overlay before commit")
+    for other in [newcomer['id']] + coworkers[:1]:
+        assert_original(overlay.shared_history(other), other, "overlay before commit")
+    hits = overlay.shared_history_cache.hits
+    started = time.perf_counter()
+    rows = overlay.shared_history(person_id)
+    cached_ms = (time.perf_counter() - started) * 1000
+    assert overlay.shared_history_cache.hits == hits + 1, "overlay: a merged result was not cached"
+    assert_original(rows, person_id, "overlay cached")
+    _assert_original(base.shared_history(person_id), base_people, base_by_person, person_id, "base before commit")
+
+    overlay.commit()
+    committed += pending
+    pending.clear()
+    assert_original(base.shared_history(person_id), person_id, "base after commit")
+    assert_original(overlay.shared_history(person_id), person_id, "overlay after commit")
+
+    # Another session commits while this one has a cached merged result
+    write(overlay, *_newcomer(rng, "Overlay Latecomer", stint))
+    assert_original(overlay.shared_history(person_id), person_id, "overlay before the other commit")
+    other = OverlayStore(base, lock)
+    write(other, *_newcomer(rng, "Other Session Newcomer", stint))
+    other.commit()
+    misses = overlay.shared_history_cache.misses
+    started = time.perf_counter()
+    rows = overlay.shared_history(person_id)
+    after_commit_ms = (time.perf_counter() - started) * 1000
+    assert overlay.shared_history_cache.misses == misses + 1, "overlay: a result was reused after another commit"
+    assert_original(rows, person_id, "overlay after another session's commit")
+    return first_ms, cached_ms, after_commit_ms
+
+
+def bench_cache(args):
+    print("Shared Work History cache, checked against the original table (ms per lookup)")
+    print(f"{'employments':>12} {'store':>13} {'first':>8} {'cached':>8} {'after write':>12}")
+    for size in args.sizes:
+        people, employments = make_dataset(size, seed=args.seed)
+        rng = random.Random(args.seed)
+        with_stints = sorted(_by_person(employments))
+        sample = rng.sample(with_stints, min(args.queries, len(with_stints)))
+        with tempfile.TemporaryDirectory() as tmp:
+            stores = (("CompactStore", lambda: CompactStore(people, employments)),
+                      ("SQLiteStore", lambda: SQLiteStore(os.path.join(tmp, "cache.db"), people, employments)))
+            for label, build in stores:
+                timings = check_store_cache(build(), people, employments, sample, rng, label)
+                print(f"{size:>12} {label:>13} {timings[0]:>8.3f} {timings[1]:>8.3f} {timings[2]:>12.3f}")
+        timings = check_overlay_cache(people, employments, sample, rng)
+        print(f"{size:>12} {'OverlayStore':>13} {timings[0]:>8.3f} {timings[1]:>8.3f} {timings[2]:>12.3f}")
+
+
+# --- Exports ---
+
+def legacy_exports(store):
+    """The CSV export the sidebar used to rebuild on every rerun."""
+    df_people = pd.DataFrame(store.people())
+    for column in ('email', 'linkedin_profile_url', 'reference_list_url'):
+        df_people[column] = df_people[column].apply(lambda x: x if x else '')
+    df_people.to_csv(index=False).encode('utf-8')
+    pd.DataFrame([
+        {"person_id": e['person_id'], "company_name": e['company_name'], "title": e['title'],
+         "start_date": e['start_date'].strftime("%Y-%m-%d"),
+         "end_date": e['end_date'].strftime("%Y-%m-%d") if e['end_date'] else "Present"}
+        for e in store.employments()
+    ]).to_csv(index=False).encode('utf-8')
+
+
+def bench_export(args):
+    print(f"{'employments':>12} {'legacy (s)':>11} {'csv (s)':>8} {'parquet (s)':>12} {'cached rerun (us)':>18}")
+    for size in args.sizes:
+        store = CompactStore(*make_dataset(size, seed=args.seed))
+        started = time.perf_counter()
+        legacy_exports(store)
+        legacy_seconds = time.perf_counter() - started
+
+        timings = {}
+        cache = ExportCache(store)
+        for fmt in ("csv", "parquet"):
+            started = time.perf_counter()
+            for dataset in ("people", "employments"):
+                cache.get(dataset, fmt)
+            timings[fmt] = time.perf_counter() - started
+
+        # What a rerun pays once the files exist and the data has not changed
+        started = time.perf_counter()
+        for _ in range(1000):
+            cache.cached("people", "csv")
+            cache.cached("employments", "csv")
+        rerun_us = (time.perf_counter() - started) * 1e6 / 1000
+        print(f"{size:>12} {legacy_seconds:>11.2f} {timings['csv']:>8.2f} {timings['parquet']:>12.2f} {rerun_us:>18.2f}")
+
+
+# --- Memory ---
+
+def make_parsed_dataset(num_employments, seed=0):
+    """
+    make_dataset() as the store sees real data: a separate str object per row
+    for repeated values (as parsed from CSV or typed into a form), where the
+    generator shares one object per company and title.
+    """
+    people, employments = make_dataset(num_employments, seed=seed)
+    for person in people:
+        person['current_title'] = "".join(person['current_title'])
+        person['current_company_name'] = "".join(person['current_company_name'])
+    for employment in employments:
+        employment['company_name'] = "".join(employment['company_name'])
+        employment['title'] = "".join(employment['title'])
+    return people, employments
+
+
+def _retained_bytes(build):
+    """Returns the bytes still allocated once build() has returned (inputs it dropped are not counted)."""
+    tracemalloc.start()
+    try:
+        built = build()
+        retained = tracemalloc.get_traced_memory()[0]
+        del built
+        return retained
+    finally:
+        tracemalloc.stop()
+
+
+def dict_store(people=(), employments=()):
+    """The row-per-dictionary layout CompactStore replaced: people by id, employments grouped by person."""
+    people = {person['id']: person for person in people}
+    employments = list(employments)
+    by_person = {}
+    for employment in employments:
+        by_person.setdefault(employment['person_id'], []).append(employment)
+    return people, employments, by_person
+
+
+def bench_memory(args):
+    print("MB per 1M employments (people = employments / 2)")
+    print(f"{'employments':>12} {'dict rows':>10} {'CompactStore':>13} {'ratio':>7} "
+          f"{'dict rows':>10} {'columns':>8} {'ratio':>7}")
+    for size in args.sizes:
+        per_million = 1e6 / size / 1e6
+        totals, people_only = {}, {}
+        for build in (dict_store, CompactStore):
+            totals[build] = _retained_bytes(lambda: build(*make_parsed_dataset(size, seed=args.seed))) * per_million
+            # Same people without employments: the difference is what the employments cost
+            people_only[build] = _retained_bytes(
+                lambda: build(make_parsed_dataset(size, seed=args.seed)[0])) * per_million
+        dict_rows = totals[dict_store] - people_only[dict_store]
+        columns = totals[CompactStore] - people_only[CompactStore]
+        print(f"{size:>12} {totals[dict_store]:>10.0f} {totals[CompactStore]:>13.0f} "
+              f"{totals[dict_store] / totals[CompactStore]:>6.1f}x "
+              f"{dict_rows:>10.0f} {columns:>8.0f} {dict_rows / columns:>6.1f}x")
+
+
+def bench_sessions(args):
+    print("Per new session: a private CompactStore copy vs. an overlay on the shared store")
+    print(f"{'employments':>12} {'copy (ms)':>10} {'copy (MB)':>10} {'overlay (ms)':>13} {'overlay (MB)':>13}")
+    for size in args.sizes:
+        people, employments = make_dataset(size, seed=args.seed)
+        shared = CompactStore(people, employments)
+        results = []
+        for build in (lambda: CompactStore(people, employments), lambda: OverlayStore(shared)):
+            started = time.perf_counter()
+            build()
+            seconds = time.perf_counter() - started
+            results += [seconds * 1000, _retained_bytes(build) / 1e6]
+        print(f"{size:>12} {results[0]:>10.1f} {results[1]:>10.1f} {results[2]:>13.3f} {results[3]:>13.3f}")
+
+
+# --- Cold Start ---
+
+# Each probe runs in a fresh interpreter and prints its wall time in seconds
+_STARTUP_PROBES = {
+    "first page": (
+        "import sys, time; started = time.perf_counter()\n"
+        "from streamlit.testing.v1 import AppTest\n"
+        "AppTest.from_file(sys.argv[1], default_timeout=600).run()\n"
+        "assert 'spacy' not in sys.modules, 'spaCy was imported by the first render'\n"
+        "print(time.perf_counter() - started)"
+    ),
+    "full spaCy model (previously on first page)": (
+        "import sys, time; started = time.perf_counter()\n"
+        "import spacy; spacy.load(sys.argv[2])\n"
+        "print(time.perf_counter() - started)"
+    ),
+    "NER-only model (first extraction)": (
+        "import sys, time; started = time.perf_counter()\n"
+        "from newsletter_nlp import load_ner_model; load_ner_model(sys.argv[2])\n"
+        "print(time.perf_counter() - started)"
+    ),
+}
+
+
+def bench_startup(args):
+    app_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+    print(f"Median of {args.repeat} fresh processes")
+    for label, probe in _STARTUP_PROBES.items():
+        seconds = [
+            float(subprocess.run([sys.executable, "-c", probe, app_path, args.model], check=True,
+                                 capture_output=True, text=True, cwd=os.path.dirname(app_path)).stdout.split()[-1])
+            for _ in range(args.repeat)
+        ]
+        print(f"{label:>45}: {statistics.median(seconds):.2f} s")
+
+
+# --- Entity Resolution ---
+
+def _misspell(name, rng):
+    position = rng.randrange(len(name))
+    return name[:position] + rng.choice("aeiou") + name[position + 1:]
+
+
+def bench_match(args):
+    print(f"{'profiles':>10} {'build (s)':>10} {'match (ms)':>11} {'top-1 hits':>11} {'pairwise (ms)':>14}")
+    for size in args.sizes:
+        rng = random.Random(args.seed)
+        names = [random_name(rng) for _ in range(size)]
+        started = time.perf_counter()
+        matcher = NameMatcher(normalize_person_name)
+        for i, name in enumerate(names):
+            matcher.add(i, name)
+        build_seconds = time.perf_counter() - started
+
+        targets = rng.sample(range(size), min(args.queries, size))
+        queries = [_misspell(names[i], rng) for i in targets]
+        started = time.perf_counter()
+        results = [matcher.match(query) for query in queries]
+        match_ms = (time.perf_counter() - started) * 1000 / len(queries)
+        # A hit is the original profile (or an identically spelled one) ranked first
+        hits = sum(1 for i, found in zip(targets, results) if found and found[0][1] == names[i])
+
+        pairwise = "skipped"
+        if size <= args.legacy_limit:
+            scan_queries = queries[:10]
+            started = time.perf_counter()
+            for query in scan_queries:
+                difflib.get_close_matches(query, names, n=5, cutoff=0.5)
+            pairwise = f"{(time.perf_counter() - started) * 1000 / len(scan_queries):.1f}"
+        print(f"{size:>10} {build_seconds:>10.2f} {match_ms:>11.2f} {hits / len(queries):>11.1%} {pairwise:>14}")
+
+
+# --- Scaling Suite ---
+
+SUITE_TODAY = NETWORK_TODAY  # "today" of the generated network, so every run gets the same data
+SUITE_PAGE_SIZE = 50
+
+
+def legacy_who_was_at(employments, company, first_date, last_date):
+    """Who was at a company during a date range, by scanning every employment."""
+    return {e['person_id'] for e in employments
+            if e['company_name'] == company and e['start_date'] <= last_date
+            and (e['end_date'] is None or e['end_date'] >= first_date)}
+
+
+def bench_analytics(args):
+    print(f"{'employments':>12} {'build (s)':>10} {'on date (ms)':>13} {'range (ms)':>11} {'legacy (ms)':>12} "
+          f"{'headcount (ms)':>15} {'flow, first (ms)':>17} {'flow (ms)':>10} {'add+query (ms)':>15}")
+    for size in args.people:
+        people, employments = generate_network(size, seed=args.seed, today=SUITE_TODAY)
+        store = CompactStore(people, employments)
+        started = time.perf_counter()
+        analytics = store.company_analytics()
+        build_seconds = time.perf_counter() - started
+
+        rng = random.Random(args.seed)
+        companies = analytics.company_names()[:5]
+        days = [SUITE_TODAY - timedelta(days=rng.randrange(20 * 365)) for _ in range(args.queries)]
+        queries = [(rng.choice(companies), day) for day in days]
+        # First queries per company also build its index; time the steady state
+        on_date_ms = _median_ms(lambda: [analytics.who_was_at(company, day) for company, day in queries],
+                                args.repeat) / len(queries)
+        range_ms = _median_ms(lambda: [analytics.who_was_at(company, day, day + timedelta(days=365))
+                                       for company, day in queries], args.repeat) / len(queries)
+        started = time.perf_counter()
+        for company, day in queries[:5]:
+            legacy_who_was_at(employments, company, day, day + timedelta(days=365))
+        legacy_ms = (time.perf_counter() - started) * 1000 / 5
+        headcount_ms = _median_ms(lambda: analytics.headcount_series(companies, date(1990, 1, 1), SUITE_TODAY),
+                                  args.repeat)
+
+        started = time.perf_counter()
+        analytics.alumni_flow_matrix(companies)
+        flow_first_ms = (time.perf_counter() - started) * 1000
+        flow_ms = _median_ms(lambda: analytics.alumni_flow_matrix(companies), args.repeat)
+
+        # The add-employment form: append a stint, then redraw the chart and the who-was-there table
+        started = time.perf_counter()
+        for index, (company, day) in enumerate(queries):
+            store.add_employment({"id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+                                  "person_id": rng.choice(people)['id'], "company_name": company,
+                                  "title": "Analyst", "start_date": day, "end_date": None})
+            analytics.headcount_series([company], date(1990, 1, 1), SUITE_TODAY)
+            analytics.who_was_at(company, day)
+        add_ms = (time.perf_counter() - started) * 1000 / len(queries)
+        print(f"{len(employments):>12} {build_seconds:>10.2f} {on_date_ms:>13.3f} {range_ms:>11.3f} {legacy_ms:>12.1f} "
+              f"{headcount_ms:>15.3f} {flow_first_ms:>17.1f} {flow_ms:>10.1f} {add_ms:>15.3f}")
+
+
+def _median_ms(func, repeat):
+    """Returns the median wall time of func() in milliseconds, after one warm-up call."""
+    func()
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def _list_view(store, **filters):
+    """What display_person_list does per rerun: count the matches, fetch one page, build its table."""
+    total, _ = store.search_people(limit=0, **filters)
+    people = store.search_people(offset=0, limit=SUITE_PAGE_SIZE, **filters)[1]
+    return pd.DataFrame({
+        "Name": [person['name'] for person in people],
+        "Current Title": [person['current_title'] for person in people],
+        "Current Company": [person['current_company_name'] for person in people],
+    })
+
+
+def run_suite(num_people, seed=0, queries=50, repeat=5):
+    """Returns {metric: value} for the core queries on a generated network of num_people people."""
+    people, employments = generate_network(num_people, seed=seed, today=SUITE_TODAY)
+    rng = random.Random(seed)
+    sample = rng.sample(people, min(queries, num_people))
+    results = {"employments": len(employments)}
+
+    started = time.perf_counter()
+    store = CompactStore(people, employments)
+    results["store build (s)"] = time.perf_counter() - started
+
+    name_prefix = sample[0]['name'].split()[0][:3]
+    results["list page (ms)"] = _median_ms(lambda: _list_view(store), repeat)
+    results["list filtered (ms)"] = _median_ms(
+        lambda: _list_view(store, name=name_prefix, current_title="associate"), repeat)
+
+    started = time.perf_counter()
+    for person in sample:
+        store.shared_history(person['id'])
+    results["shared history (ms/person)"] = (time.perf_counter() - started) * 1000 / len(sample)
+    started = time.perf_counter()
+    for person in sample:
+        store.shared_history(person['id'])
+    results["shared history, repeat view (ms/person)"] = (time.perf_counter() - started) * 1000 / len(sample)
+
+    # Coworker graph: the components and the per-person/per-company stint lists
+    # are built on first use, then the details view's network queries
+    started = time.perf_counter()
+    graph = store.coworker_graph()
+    graph.component_size(sample[0]['id'])
+    graph.warm_intro_path(sample[0]['id'], sample[0]['current_company_name'])
+    results["coworker graph build (s)"] = time.perf_counter() - started
+    started = time.perf_counter()
+    for person in sample:
+        graph.strongest_connections(person['id'], k=10)
+    results["strongest connections (ms/person)"] = (time.perf_counter() - started) * 1000 / len(sample)
+    started = time.perf_counter()
+    for person, target in zip(sample, reversed(sample)):
+        graph.warm_intro_path(person['id'], target['current_company_name'])
+    results["warm intro path (ms/person)"] = (time.perf_counter() - started) * 1000 / len(sample)
+
+    # Overlap math over every employment against one stint: vectorized, and the per-pair helper
+    columns = store.employment_columns()
+    stint = employments[0]
+    start, end = np.datetime64(stint['start_date'], 'D'), np.datetime64(stint['end_date'] or 'NaT', 'D')
+    results["overlap_years, all rows (ms)"] = _median_ms(
+        lambda: overlap_years(start, end, columns['start_date'], columns['end_date'], today=SUITE_TODAY), repeat)
+    pairs = employments[:10_000]
+    started = time.perf_counter()
+    for other in pairs:
+        calculate_overlap_years(stint['start_date'], stint['end_date'], other['start_date'], other['end_date'])
+    results["calculate_overlap_years (us/pair)"] = (time.perf_counter() - started) * 1e6 / len(pairs)
+
+    started = time.perf_counter()
+    to_csv_bytes(people_frame(store))
+    to_csv_bytes(employments_frame(store))
+    results["csv export (s)"] = time.perf_counter() - started
+    return results
+
+
+def _environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"commit": commit, "python": platform.python_version(), "numpy": np.__version__,
+            "pandas": pd.__version__, "machine": platform.machine(), "processor": platform.processor(),
+            "cpus": os.cpu_count()}
+
+
+def bench_suite(args):
+    report = {"environment": _environment(), "seed": args.seed, "queries": args.queries, "repeat": args.repeat,
+              "results": {}}
+    for size in args.people:
+        results = report["results"][str(size)] = run_suite(size, seed=args.seed, queries=args.queries,
+                                                           repeat=args.repeat)
+        print(f"{size:,} people")
+        for metric, value in results.items():
+            print(f"  {metric:>40}: {value:,.3f}" if isinstance(value, float) else f"  {metric:>40}: {value:,}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2)
+        print(f"Wrote {args.output}")
+
+
+def bench_compare(args):
+    with open(args.baseline, encoding="utf-8") as baseline, open(args.candidate, encoding="utf-8") as candidate:
+        before, after = json.load(baseline), json.load(candidate)
+    print(f"{before['environment']['commit'] or args.baseline} -> {after['environment']['commit'] or args.candidate}")
+    if (before['seed'], before['environment']['machine']) != (after['seed'], after['environment']['machine']):
+        print("Warning: different seed or machine; the numbers are not directly comparable")
+    print(f"{'people':>10} {'metric':>36} {'before':>12} {'after':>12} {'ratio':>7}")
+    for size, results in after["results"].items():
+        for metric, value in results.items():
+            old = before["results"].get(size, {}).get(metric)
+            if old is None or not isinstance(value, float):
+                continue
+            ratio = value / old if old else float("inf")
+            flag = "  slower" if ratio > args.threshold else "  faster" if ratio < 1 / args.threshold else ""
+            print(f"{int(size):>10,} {metric:>40} {old:>12.3f} {value:>12.3f} {ratio:>6.2f}x{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    shared = subcommands.add_parser("shared-history", help="Shared Work History lookup: CompactStore vs. the original all-pairs table")
+    shared.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    shared.add_argument("--queries", type=int, default=200, help="profiles looked up per size")
+    shared.add_argument("--legacy-limit", type=int, default=100_000,
+                        help="largest size at which the original table is also built, timed and checked")
+    shared.add_argument("--seed", type=int, default=0)
+    shared.set_defaults(func=bench_shared_history)
+
+    overlap = subcommands.add_parser("overlap", help="Shared Work History at one large company: original loop vs. OverlapEngine")
+    overlap.add_argument("--sizes", type=int, nargs="+", default=[1_000, 5_000, 20_000, 100_000])
+    overlap.add_argument("--repeat", type=int, default=20)
+    overlap.add_argument("--seed", type=int, default=0)
+    overlap.set_defaults(func=bench_overlap)
+
+    graph = subcommands.add_parser("graph", help="CoworkerGraph on generated networks: components, incremental adds, "
+                                                 "top-k, warm-intro path")
+    graph.add_argument("--people", type=int, nargs="+", default=[20_000, 100_000, 1_000_000])
+    graph.add_argument("--queries", type=int, default=200)
+    graph.add_argument("--seed", type=int, default=0)
+    graph.set_defaults(func=bench_graph)
+
+    bulk = subcommands.add_parser("import", help="Streaming CSV import into a SQLite store: rows/s and peak memory")
+    bulk.add_argument("--rows", type=int, default=2_000_000, help="employment rows (people = rows / 2)")
+    bulk.add_argument("--chunksize", type=int, default=50_000)
+    bulk.add_argument("--trace-memory", action="store_true",
+                      help="report the tracemalloc peak of the import instead of its RSS growth (slower)")
+    bulk.add_argument("--seed", type=int, default=0)
+    bulk.set_defaults(func=bench_import)
+
+    lookups = subcommands.add_parser("lookups", help="get_person_by_id / get_employments_by_person_id: store vs. list scan")
+    lookups.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    lookups.add_argument("--queries", type=int, default=10_000)
+    lookups.add_argument("--legacy-limit", type=int, default=1_000_000)
+    lookups.add_argument("--seed", type=int, default=0)
+    lookups.set_defaults(func=bench_lookups)
+
+    sqlite = subcommands.add_parser("sqlite", help="SQLiteStore: open time, indexed lookups and the shared-history self-join")
+    sqlite.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    sqlite.add_argument("--queries", type=int, default=200)
+    sqlite.add_argument("--seed", type=int, default=0)
+    sqlite.set_defaults(func=bench_sqlite)
+
+    cache = subcommands.add_parser("cache", help="Shared Work History caches of every store: hits, invalidation, daily "
+                                                 "refresh, write races and overlay commits, checked against the "
+                                                 "original table")
+    cache.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000])
+    cache.add_argument("--queries", type=int, default=20, help="people looked up per size")
+    cache.add_argument("--seed", type=int, default=0)
+    cache.set_defaults(func=bench_cache)
+
+    memory = subcommands.add_parser("memory", help="Retained memory per 1M employments: dict rows vs. CompactStore")
+    memory.add_argument("--sizes", type=int, nargs="+", default=[100_000])
+    memory.add_argument("--seed", type=int, default=0)
+    memory.set_defaults(func=bench_memory)
+
+    suite = subcommands.add_parser("suite", help="Core queries on generated networks: list view, shared history, "
+                                                 "coworker graph, overlap math, CSV export (optionally saved as JSON)")
+    suite.add_argument("--people", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    suite.add_argument("--queries", type=int, default=50, help="people whose shared history is computed per size")
+    suite.add_argument("--repeat", type=int, default=5, help="timed repetitions of the fast queries (median)")
+    suite.add_argument("--output", help="write the results and environment to this JSON file")
+    suite.add_argument("--seed", type=int, default=0)
+    suite.set_defaults(func=bench_suite)
+
+    compare = subcommands.add_parser("compare", help="Compare two suite --output files, e.g. from two commits")
+    compare.add_argument("baseline")
+    compare.add_argument("candidate")
+    compare.add_argument("--threshold", type=float, default=1.1, help="ratio beyond which a metric is flagged")
+    compare.set_defaults(func=bench_compare)
+
+    analytics = subcommands.add_parser("analytics", help="Company analytics: who was there, headcount over time, "
+                                                         "alumni flow, incremental adds")
+    analytics.add_argument("--people", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    analytics.add_argument("--queries", type=int, default=50, help="who-was-there queries (and adds) per size")
+    analytics.add_argument("--repeat", type=int, default=5, help="timed repetitions (median)")
+    analytics.add_argument("--seed", type=int, default=0)
+    analytics.set_defaults(func=bench_analytics)
+
+    sessions = subcommands.add_parser("sessions", help="New-session cost: private store copy vs. copy-on-write overlay")
+    sessions.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    sessions.add_argument("--seed", type=int, default=0)
+    sessions.set_defaults(func=bench_sessions)
+
+    startup = subcommands.add_parser("startup", help="Cold start: first page render vs. spaCy import and model load")
+    startup.add_argument("--repeat", type=int, default=5)
+    startup.add_argument("--model", default=SPACY_MODEL)
+    startup.set_defaults(func=bench_startup)
+
+    export = subcommands.add_parser("export", help="Export files: per-rerun legacy CSV vs. cached CSV/Parquet")
+    export.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    export.add_argument("--seed", type=int, default=0)
+    export.set_defaults(func=bench_export)
+
+    match = subcommands.add_parser("match", help="Fuzzy name matching: trigram index vs. pairwise difflib scan")
+    match.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    match.add_argument("--queries", type=int, default=500, help="misspelled names looked up per size")
+    match.add_argument("--legacy-limit", type=int, default=100_000,
+                       help="largest size at which the pairwise scan is also timed")
+    match.add_argument("--seed", type=int, default=0)
+    match.set_defaults(func=bench_match)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
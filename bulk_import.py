@@ -0,0 +1,202 @@
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from dataclasses import dataclass
+
+import pandas as pd
+
+PEOPLE_COLUMNS = ["id", "name", "current_title", "current_company_name",
+                  "email", "linkedin_profile_url", "reference_list_url"]
+EMPLOYMENT_COLUMNS = ["person_id", "company_name", "title", "start_date", "end_date"]
+DATE_FORMAT = "%Y-%m-%d"
+DEFAULT_CHUNKSIZE = 50_000
+
+
+@dataclass
+class ImportReport:
+    """Outcome of one bulk import."""
+    rows_read: int = 0
+    rows_loaded: int = 0
+    rows_rejected: int = 0
+    rows_duplicate: int = 0
+    seconds: float = 0.0
+    peak_memory_bytes: int = 0
+    memory_measure: str = "peak memory"  # what peak_memory_bytes measures, see _measured
+
+    @property
+    def rows_per_second(self):
+        return self.rows_read / self.seconds if self.seconds else 0.0
+
+    def summary(self):
+        return (f"Loaded {self.rows_loaded:,} of {self.rows_read:,} rows "
+                f"({self.rows_rejected:,} invalid, {self.rows_duplicate:,} duplicate) "
+                f"at {self.rows_per_second:,.0f} rows/s, {self.memory_measure} {self.peak_memory_bytes / 2**20:,.1f} MiB")
+
+
+def _read_chunks(source, columns, chunksize):
+    """Streams a CSV as string-typed DataFrames, keeping empty cells as ''."""
+    reader = pd.read_csv(source, dtype=str, keep_default_na=False, chunksize=chunksize)
+    for chunk in reader:
+        missing = [column for column in columns if column not in chunk.columns]
+        if missing:
+            raise ValueError(f"CSV is missing required columns: {', '.join(missing)}")
+        yield chunk[columns].apply(lambda column: column.str.strip())
+
+
+def _peak_rss_bytes():
+    """Returns the process's lifetime peak resident set size (0 where unavailable)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # bytes on macOS, KiB on Linux
+
+
+def _current_rss_bytes():
+    """Returns the process's current resident set size, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class _RssSampler:
+    """Tracks the highest current RSS seen while running, polled from a background thread."""
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak = _current_rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="import-rss-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, _current_rss_bytes())
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _current_rss_bytes())
+
+
+def _measured(load, trace_memory):
+    """
+    Runs load(report) and records its duration and peak memory. With
+    trace_memory, it is the peak of Python allocations during the import
+    (about 5x slower). Otherwise it is how far the process's RSS rose above
+    its level at the start. RSS is sampled every 10 ms where /proc exists.
+    Elsewhere it falls back to the process's lifetime peak RSS, labelled
+    as such, which a long-running server may have reached before the import.
+    """
+    report = ImportReport()
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if trace_memory:
+        tracemalloc.reset_peak()
+    baseline = None if trace_memory else _current_rss_bytes()
+    sampler = _RssSampler().start() if baseline is not None else None
+    started = time.perf_counter()
+    try:
+        load(report)
+    finally:
+        report.seconds = time.perf_counter() - started
+        if trace_memory:
+            report.peak_memory_bytes = tracemalloc.get_traced_memory()[1]
+            report.memory_measure = "peak Python allocations"
+        elif sampler is not None:
+            sampler.stop()
+            report.peak_memory_bytes = max(sampler.peak - baseline, 0)
+            report.memory_measure = "peak RSS growth"
+        else:
+            report.peak_memory_bytes = _peak_rss_bytes()
+            report.memory_measure = "process peak RSS"
+        if started_tracing:
+            tracemalloc.stop()
+    return report
+
+
+def import_people_csv(store, source, chunksize=DEFAULT_CHUNKSIZE, trace_memory=False):
+    """
+    Streams a professional_profiles.csv export into the store.
+
+    Rows without a name are rejected. Rows without an id get a new uuid4;
+    rows whose id is already in the store (or earlier in the file), and
+    id-less rows repeating an earlier (name, email, LinkedIn URL), are
+    skipped as duplicates. Returns an ImportReport (see _measured for
+    trace_memory).
+    """
+    def load(report):
+        seen_ids = set()
+        seen_keys = set()
+        for chunk in _read_chunks(source, PEOPLE_COLUMNS, chunksize):
+            report.rows_read += len(chunk)
+            valid = chunk['name'] != ''
+            report.rows_rejected += int((~valid).sum())
+            chunk = chunk[valid]
+
+            has_id = chunk['id'] != ''
+            keys = chunk['name'].str.casefold() + '\0' + chunk['email'].str.casefold() + '\0' + chunk['linkedin_profile_url']
+            duplicate = (has_id & (chunk['id'].duplicated() | chunk['id'].isin(seen_ids))) | \
+                        (~has_id & (keys.duplicated() | keys.isin(seen_keys)))
+            existing = store.existing_person_ids(chunk.loc[has_id & ~duplicate, 'id'].tolist())
+            duplicate |= chunk['id'].isin(existing)
+            seen_ids.update(chunk.loc[has_id, 'id'])
+            seen_keys.update(keys[~has_id])
+            report.rows_duplicate += int(duplicate.sum())
+            chunk = chunk[~duplicate].copy()
+
+            missing_id = chunk['id'] == ''
+            chunk.loc[missing_id, 'id'] = [str(uuid.uuid4()) for _ in range(int(missing_id.sum()))]
+            store.add_many(people=chunk.to_dict("records"))
+            report.rows_loaded += len(chunk)
+
+    return _measured(load, trace_memory)
+
+
+def import_employments_csv(store, source, chunksize=DEFAULT_CHUNKSIZE, trace_memory=False):
+    """
+    Streams an employment_history.csv export into the store.
+
+    end_date may be "Present" (or empty) for ongoing stints. Rows are rejected
+    when a required field is empty, a date does not parse as YYYY-MM-DD, the
+    end date is before the start date, or person_id is not in the store.
+    Every loaded row gets a new uuid4 id. Returns an ImportReport (see
+    _measured for trace_memory).
+    """
+    def load(report):
+        for chunk in _read_chunks(source, EMPLOYMENT_COLUMNS, chunksize):
+            report.rows_read += len(chunk)
+            start = pd.to_datetime(chunk['start_date'], format=DATE_FORMAT, errors='coerce')
+            present = chunk['end_date'].str.casefold().isin(["present", ""])
+            end = pd.to_datetime(chunk['end_date'].where(~present), format=DATE_FORMAT, errors='coerce')
+            valid = (
+                (chunk['person_id'] != '') & (chunk['company_name'] != '') & (chunk['title'] != '')
+                & start.notna() & (present | (end.notna() & (end >= start)))
+            )
+            known = store.existing_person_ids(chunk.loc[valid, 'person_id'].unique().tolist())
+            valid &= chunk['person_id'].isin(known)
+            report.rows_rejected += int((~valid).sum())
+
+            chunk, start, end = chunk[valid], start[valid], end[valid]
+            employments = [
+                {"id": str(uuid.uuid4()), "person_id": person_id, "company_name": company_name, "title": title,
+                 "start_date": start_date, "end_date": None if pd.isna(end_date) else end_date}
+                for person_id, company_name, title, start_date, end_date in zip(
+                    chunk['person_id'], chunk['company_name'], chunk['title'],
+                    start.dt.date, end.dt.date.astype(object)
+                )
+            ]
+            store.add_many(employments=employments)
+            report.rows_loaded += len(employments)
+
+    return _measured(load, trace_memory)
@@ -0,0 +1,62 @@
+import numpy as np
+
+
+class GrowableArray:
+    """A numpy array with amortized O(1) appends."""
+
+    __slots__ = ("data", "size")
+
+    def __init__(self, dtype):
+        self.data = np.empty(16, dtype=dtype)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def append(self, value):
+        if self.size == len(self.data):
+            self.data = np.resize(self.data, 2 * len(self.data))
+        self.data[self.size] = value
+        self.size += 1
+
+    def view(self):
+        return self.data[:self.size]
+
+
+class StringPool:
+    """
+    Dictionary encoding for a low-cardinality string column: each distinct
+    value is stored once and rows hold its int32 code.
+    """
+
+    __slots__ = ("_codes", "_values")
+
+    def __init__(self):
+        self._codes = {}  # value -> code
+        self._values = GrowableArray(object)  # code -> value
+
+    def __len__(self):
+        return self._values.size
+
+    def __getitem__(self, code):
+        return self._values.data[code]
+
+    def code(self, value):
+        """Returns the code of value, adding it to the pool if needed."""
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = self._values.size
+            self._values.append(value)
+        return code
+
+    def get(self, value, default=None):
+        """Returns the code of value without adding it."""
+        return self._codes.get(value, default)
+
+    def take(self, codes):
+        """Decodes an array of codes into an object array of values."""
+        return self._values.data[codes]
+
+    def values(self):
+        """Returns the distinct values in code order."""
+        return self._values.view().tolist()
@@ -0,0 +1,336 @@
+import uuid
+from collections.abc import Mapping
+from datetime import date
+
+import numpy as np
+
+from columns import GrowableArray, StringPool
+from company_analytics import CompanyAnalytics
+from coworker_graph import CoworkerGraph
+from entity_matcher import EntityResolver
+from history_cache import SharedHistoryCache
+from overlap import OverlapEngine
+from people_index import PeopleIndex
+
+PERSON_FIELDS = ("id", "name", "current_title", "current_company_name",
+                 "email", "linkedin_profile_url", "reference_list_url")
+EMPLOYMENT_FIELDS = ("id", "person_id", "company_name", "title", "start_date", "end_date")
+_CONTACT_FIELDS = ("email", "linkedin_profile_url", "reference_list_url")
+_UINT64_MASK = (1 << 64) - 1
+
+
+class _Record(Mapping):
+    """
+    Read-only view of one row of a CompactStore, usable like the dictionary
+    it replaces (record['name'], record.get('email'), dict(record)) and by
+    attribute (record.name). Fields are decoded on access.
+    """
+
+    __slots__ = ("_store", "_row")
+    _fields = ()
+
+    def __init__(self, store, row):
+        self._store = store
+        self._row = row
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __getattr__(self, field):
+        try:
+            return self[field]
+        except KeyError:
+            raise AttributeError(field) from None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"
+
+
+class PersonRecord(_Record):
+    __slots__ = ()
+    _fields = PERSON_FIELDS
+
+    def __getitem__(self, field):
+        return self._store._person_field(self._row, field)
+
+
+class EmploymentRecord(_Record):
+    __slots__ = ()
+    _fields = EMPLOYMENT_FIELDS
+
+    def __getitem__(self, field):
+        return self._store._employment_field(self._row, field)
+
+
+class CompactStore:
+    """
+    In-memory store for people and their employment history, in a columnar
+    layout. SQLiteStore and OverlayStore share its interface.
+
+    Instead of one dictionary per row, people and employments live in numpy
+    columns addressed by integer surrogate keys (a person's code in the
+    overlap engine, an employment's row number):
+
+    - person codes, company names and start/end dates (datetime64 days since
+      the epoch) are the OverlapEngine's own columns, not a second copy;
+    - titles and current company names are dictionary-encoded into int32
+      codes, so "Viking Global Investors" is stored once;
+    - canonical uuid ids are held as two uint64 halves (other ids as strings).
+
+    Reads return PersonRecord/EmploymentRecord views that decode fields on
+    access. Employments must reference people already in the store.
+    """
+
+    def __init__(self, people=(), employments=()):
+        self.overlap_engine = OverlapEngine()
+        self._search_index = PeopleIndex()
+        self._titles = StringPool()     # titles of people and employments
+        self._companies = StringPool()  # current company names of people
+        self._coworker_graph = None   # built on first use, then kept up to date
+        self._entity_resolver = None  # likewise
+        self._company_analytics = None  # likewise
+        self.shared_history_cache = SharedHistoryCache()  # public for its hit and miss counts
+        self._data_version = 0        # bumped by every write
+
+        # People, indexed by person code
+        self._person_title = GrowableArray(np.int32)
+        self._person_company = GrowableArray(np.int32)
+        self._contacts = {field: [] for field in _CONTACT_FIELDS}  # mostly '', so plain lists
+        self._num_people = 0
+
+        # Employments, indexed by row
+        self._employment_id_high = GrowableArray(np.uint64)
+        self._employment_id_low = GrowableArray(np.uint64)
+        self._employment_id_other = {}  # row -> id, for ids that are not canonical uuids
+        self._employment_title = GrowableArray(np.int32)
+
+        self.add_many(people, employments)
+
+    # --- Writes ---
+
+    def add_person(self, person):
+        """Adds a person dictionary (must carry a unique 'id')."""
+        code = self.overlap_engine.person_code(person['id'])
+        if code is not None:
+            raise ValueError(f"Person {person['id']!r} is already in the store")
+        self.overlap_engine.add_person(person['id'], person['name'])
+        code = self.overlap_engine.person_code(person['id'])
+        self._person_title.append(self._titles.code(person.get('current_title') or ''))
+        self._person_company.append(self._companies.code(person.get('current_company_name') or ''))
+        for field, values in self._contacts.items():
+            values.append(person.get(field) or '')
+        self._num_people += 1
+        self._data_version += 1
+        self._search_index.add(code, person)
+        if self._coworker_graph is not None:
+            self._coworker_graph.add_person(person['id'])
+        if self._entity_resolver is not None:
+            self._entity_resolver.add_person(person)
+
+    def add_employment(self, employment):
+        """Adds an employment dictionary for a person already in the store."""
+        if self.overlap_engine.person_code(employment['person_id']) is None:
+            raise ValueError(f"Unknown person id {employment['person_id']!r}")
+        row = len(self.overlap_engine)
+        self.overlap_engine.add_employment(employment)
+        self._append_id(row, employment['id'])
+        self._employment_title.append(self._titles.code(employment['title']))
+        self._data_version += 1
+        self.shared_history_cache.invalidate_employment(employment)
+        if self._coworker_graph is not None:
+            self._coworker_graph.add_employment(employment)
+        if self._entity_resolver is not None:
+            self._entity_resolver.add_employment(employment)
+        if self._company_analytics is not None:
+            self._company_analytics.add(employment)
+
+    def _append_id(self, row, employment_id):
+        try:
+            canonical = str(uuid.UUID(employment_id)) == employment_id
+        except (TypeError, ValueError, AttributeError):
+            canonical = False
+        value = uuid.UUID(employment_id).int if canonical else 0
+        if not canonical:
+            self._employment_id_other[row] = employment_id
+        self._employment_id_high.append(value >> 64)
+        self._employment_id_low.append(value & _UINT64_MASK)
+
+    def add_many(self, people=(), employments=()):
+        """Adds people, then employments."""
+        for person in people:
+            self.add_person(person)
+        for employment in employments:
+            self.add_employment(employment)
+
+    def update_person(self, person_id, **fields):
+        """Updates the given fields of a person."""
+        unknown = set(fields) - set(PERSON_FIELDS[1:])
+        if unknown:
+            raise ValueError(f"Unknown person fields: {', '.join(sorted(unknown))}")
+        code = self.overlap_engine.person_code(person_id)
+        self._search_index.update(code, PersonRecord(self, code), fields)
+        for field, value in fields.items():
+            if field == 'name':
+                self.overlap_engine.add_person(person_id, value)
+                self.shared_history_cache.clear()  # names decide dedup and order
+            elif field == 'current_title':
+                self._person_title.data[code] = self._titles.code(value or '')
+            elif field == 'current_company_name':
+                self._person_company.data[code] = self._companies.code(value or '')
+            else:
+                self._contacts[field][code] = value or ''
+        self._data_version += 1
+        if self._entity_resolver is not None and fields.get('current_company_name'):
+            self._entity_resolver.add_company(fields['current_company_name'])
+
+    # --- Field decoding ---
+
+    def _person_field(self, code, field):
+        engine = self.overlap_engine
+        if field == 'id':
+            return engine.person_id(code)
+        if field == 'name':
+            return engine.name(code)
+        if field == 'current_title':
+            return self._titles[self._person_title.data[code]]
+        if field == 'current_company_name':
+            return self._companies[self._person_company.data[code]]
+        return self._contacts[field][code]
+
+    def _employment_field(self, row, field):
+        if field == 'id':
+            other = self._employment_id_other.get(row)
+            if other is not None:
+                return other
+            return str(uuid.UUID(int=(int(self._employment_id_high.data[row]) << 64)
+                                 | int(self._employment_id_low.data[row])))
+        if field == 'title':
+            return self._titles[self._employment_title.data[row]]
+        person_code, company_name, start_date, end_date = self.overlap_engine.employment(row)
+        if field == 'person_id':
+            return self.overlap_engine.person_id(person_code)
+        if field == 'company_name':
+            return company_name
+        if field == 'start_date':
+            return start_date
+        if field == 'end_date':
+            return end_date
+        raise KeyError(field)
+
+    # --- Reads ---
+
+    def data_version(self):
+        """Returns a counter that changes whenever people or employments are written."""
+        return self._data_version
+
+    def get_person(self, person_id):
+        """Returns a PersonRecord for an id, or None."""
+        code = self.overlap_engine.person_code(person_id)
+        return PersonRecord(self, code) if code is not None else None
+
+    def existing_person_ids(self, person_ids):
+        """Returns the subset of the given ids that belong to stored people."""
+        return {person_id for person_id in person_ids if self.overlap_engine.person_code(person_id) is not None}
+
+    def search_people(self, offset=0, limit=50, **filters):
+        """
+        Returns (total matches, PersonRecords on the page) for word-prefix
+        filters on name, current_company_name and current_title, in insertion
+        order. See PeopleIndex.search.
+        """
+        total, codes = self._search_index.search(offset=offset, limit=limit, **filters)
+        return total, [PersonRecord(self, code) for code in codes]
+
+    def employments_for(self, person_id):
+        """Returns the EmploymentRecords of a person, in insertion order."""
+        code = self.overlap_engine.person_code(person_id)
+        if code is None:
+            return []
+        return [EmploymentRecord(self, row) for row in self.overlap_engine.rows_for(code)]
+
+    def people(self):
+        """Returns a PersonRecord for every person, in insertion order."""
+        return [PersonRecord(self, code) for code in range(self._num_people)]
+
+    def employments(self):
+        """Returns an EmploymentRecord for every employment, in insertion order."""
+        return [EmploymentRecord(self, row) for row in range(len(self.overlap_engine))]
+
+    def person_columns(self):
+        """Returns every person field as a column (a list or object array), for bulk export."""
+        engine = self.overlap_engine
+        columns = {
+            "id": [engine.person_id(code) for code in range(self._num_people)],
+            "name": [engine.name(code) for code in range(self._num_people)],
+        }
+        columns['current_title'] = self._titles.take(self._person_title.view())
+        columns['current_company_name'] = self._companies.take(self._person_company.view())
+        columns.update(self._contacts)
+        return columns
+
+    def employment_columns(self):
+        """
+        Returns every employment field except id as a column, for bulk export;
+        dates are datetime64[D] with NaT while ongoing.
+        """
+        engine_columns = self.overlap_engine.columns()
+        return {
+            "person_id": engine_columns['person_id'],
+            "company_name": engine_columns['company_name'],
+            "title": self._titles.take(self._employment_title.view()),
+            "start_date": engine_columns['start_date'],
+            "end_date": engine_columns['end_date'],
+        }
+
+    def companies(self):
+        """Returns the set of company names that appear in employment history."""
+        return set(self.overlap_engine.company_names())
+
+    def num_people(self):
+        return self._num_people
+
+    def num_employments(self):
+        return len(self.overlap_engine)
+
+    def shared_history(self, person_id):
+        """
+        Returns the Shared Work History of a person: one dict per other person
+        and overlapping company with keys person_id, name, current_company_name,
+        company_name (the selected person's spelling) and overlap_years, in the
+        original table's rows and order. See OverlapEngine.shared_history.
+
+        Results are cached per person (see history_cache.SharedHistoryCache).
+        """
+        engine = self.overlap_engine
+        today = date.today()
+        rows = self.shared_history_cache.get(person_id, today)
+        if rows is None:
+            generation = self.shared_history_cache.generation()
+            rows = engine.shared_history(person_id, today=today).to_dict("records")
+            stints = [engine.employment(row)[1:] for row in engine.rows_for(engine.person_code(person_id))]
+            self.shared_history_cache.put(person_id, rows, stints, today, generation)
+        return [dict(row, current_company_name=self._companies[self._person_company.data[engine.person_code(row['person_id'])]])
+                for row in rows]
+
+    def coworker_graph(self):
+        """Returns the CoworkerGraph over all people, sharing the overlap engine's columns."""
+        if self._coworker_graph is None:
+            self._coworker_graph = CoworkerGraph(self.overlap_engine)
+        return self._coworker_graph
+
+    def company_analytics(self):
+        """Returns the CompanyAnalytics over all employments, building it from the columns on first use."""
+        if self._company_analytics is None:
+            columns = self.overlap_engine.columns()
+            self._company_analytics = CompanyAnalytics.from_columns(
+                columns['person_id'], columns['company_name'], columns['start_date'], columns['end_date'])
+        return self._company_analytics
+
+    def entity_resolver(self):
+        """Returns the EntityResolver over all names and companies, building it on first use."""
+        if self._entity_resolver is None:
+            self._entity_resolver = EntityResolver(self.people(), self.employments())
+        return self._entity_resolver
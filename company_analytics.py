@@ -0,0 +1,286 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from columns import GrowableArray, StringPool
+from overlap import BLOCK, EPOCH_ORDINAL, NO_END, as_dates, as_days
+
+
+def _day(value):
+    """Returns a date as int days since the epoch."""
+    return value.toordinal() - EPOCH_ORDINAL
+
+
+class _CompanyIndex:
+    """
+    The stints at one company, indexed two ways once built:
+
+    - ended stints sorted by start day, with the latest end day of every
+      BLOCK rows (a max-end segment tree flattened to its leaf level), so a
+      date range query only inspects the blocks that can hold an
+      overlapping stint, and ongoing stints sorted by start day apart;
+    - the headcount timeline: the distinct days on which someone joined or
+      left, with the running headcount from each of those days (prefix sums
+      of the +1/-1 events), so headcount on any day is one binary search.
+
+    New stints wait in a pending buffer that queries scan directly and that
+    is merged in once it grows past sqrt(n).
+    """
+
+    __slots__ = ("rows", "starts", "ends", "block_max_end", "current", "current_starts", "days", "headcount",
+                 "pending", "built")
+
+    def __init__(self, rows=()):
+        self.rows = np.asarray(rows, dtype=np.int64)  # every row until built, then the ended ones
+        self.current = np.empty(0, dtype=np.int64)
+        self.pending = []
+        self.built = False
+
+    def __len__(self):
+        return len(self.rows) + len(self.current) + len(self.pending)
+
+    def add(self, row):
+        self.pending.append(row)
+
+    def prepare(self, start, end):
+        """Builds the index on first use, and merges a pending buffer that has outgrown sqrt(n)."""
+        if not self.built or len(self.pending) ** 2 > max(len(self.rows), 1024):
+            self._build(start, end)
+
+    def _build(self, start, end):
+        rows = np.concatenate([self.rows, self.current, np.asarray(self.pending, dtype=np.int64)])
+        rows = rows[np.lexsort((rows, start[rows]))]
+        ongoing = end[rows] == NO_END
+        self.current, self.rows, self.pending = rows[ongoing], rows[~ongoing], []
+        self.current_starts, self.starts, self.ends = start[self.current], start[self.rows], end[self.rows]
+        ends = self.ends
+        self.block_max_end = (np.maximum.reduceat(ends, np.arange(0, len(ends), BLOCK)) if len(ends)
+                              else np.empty(0, dtype=np.int32))
+        # A stint counts from its start day through its end day inclusive
+        starts = start[rows].astype(np.int64)
+        self.days, inverse = np.unique(np.concatenate([starts, ends.astype(np.int64) + 1]), return_inverse=True)
+        joins = np.bincount(inverse[:len(starts)], minlength=len(self.days))
+        leaves = np.bincount(inverse[len(starts):], minlength=len(self.days))
+        self.headcount = np.cumsum(joins - leaves)
+        self.built = True
+
+    def headcount_on(self, days, start, end):
+        """Returns the number of stints covering each of the given days."""
+        index = np.searchsorted(self.days, days, side='right') - 1
+        counts = np.where(index >= 0, self.headcount[np.maximum(index, 0)], 0)
+        if self.pending:
+            pending = np.asarray(self.pending, dtype=np.int64)
+            ends = end[pending][None, :]
+            counts = counts + ((start[pending][None, :] <= days[:, None])
+                               & ((ends >= days[:, None]) | (ends == NO_END))).sum(axis=1)
+        return counts
+
+    def overlapping(self, first_day, last_day, start, end):
+        """Returns the rows of stints covering any day in [first_day, last_day], by start day."""
+        limit = np.searchsorted(self.starts, last_day, side='right')
+        blocks = np.flatnonzero(self.block_max_end[:-(-limit // BLOCK)] >= first_day)
+        candidates = (blocks[:, None] * BLOCK + np.arange(BLOCK)).ravel()
+        candidates = candidates[candidates < limit]
+        rows = self.rows[candidates[self.ends[candidates] >= first_day]]
+        rows = np.concatenate([rows, self.current[:np.searchsorted(self.current_starts, last_day, side='right')]])
+        if self.pending:
+            pending = np.asarray(self.pending, dtype=np.int64)
+            ends = end[pending]
+            pending = pending[(start[pending] <= last_day) & ((ends >= first_day) | (ends == NO_END))]
+            rows = np.concatenate([rows, pending])
+        return rows[np.lexsort((rows, start[rows]))]
+
+
+class CompanyAnalytics:
+    """
+    Time-sliced company questions over all employment stints: who was at a
+    company on a date or during a range, how its headcount changed over time,
+    and where people went next (alumni flow).
+
+    Stints live in int32 columns (person, company, start and end day), with
+    a _CompanyIndex per company built on the first query about it. add()
+    appends a stint in O(1) and only touches its own company's index.
+    Queries build and merge indexes lazily, so add() and queries take one
+    lock: the object can be shared between sessions' threads. The
+    person-to-next-company transitions behind alumni_flow() are derived for
+    all people at once and recomputed after a write.
+
+    Companies are matched by company_name exactly as entered, as in Shared
+    Work History and warm introductions. Headcount counts stints, so a
+    person with two overlapping stints at one company counts twice.
+    """
+
+    def __init__(self, employments=()):
+        self._person_codes = {}  # person id -> code
+        self._person_ids = GrowableArray(object)
+        self._company_names = StringPool()  # company name <-> code
+        self._companies = []      # company code -> _CompanyIndex
+        self._person = GrowableArray(np.int32)
+        self._company = GrowableArray(np.int32)
+        self._start = GrowableArray(np.int32)
+        self._end = GrowableArray(np.int32)
+        self._transitions = None  # (from company, to company, move day), derived on first use
+        self._lock = threading.RLock()  # add() and the lazy index builds vs. queries from other threads
+        for employment in employments:
+            self.add(employment)
+
+    @classmethod
+    def from_columns(cls, person_id, company_name, start_date, end_date):
+        """
+        Builds the analytics from parallel employment columns (dates as
+        datetime64 with NaT while ongoing), without per-row Python work.
+        """
+        analytics = cls()
+        person_codes, person_ids = pd.factorize(np.asarray(person_id, dtype=object))
+        companies, names = pd.factorize(np.asarray(company_name, dtype=object))
+        for name in names:
+            analytics._company_names.code(name)
+            analytics._companies.append(_CompanyIndex())
+
+        if not len(person_codes):
+            return analytics
+        analytics._person_codes = {person: code for code, person in enumerate(person_ids)}
+        for column, values in ((analytics._person_ids, person_ids), (analytics._person, person_codes),
+                               (analytics._company, companies), (analytics._start, as_days(start_date)),
+                               (analytics._end, as_days(end_date))):
+            column.data = np.asarray(values, dtype=column.data.dtype)
+            column.size = len(values)
+
+        order = np.argsort(companies, kind='stable')
+        bounds = np.searchsorted(companies[order], np.arange(len(analytics._companies) + 1))
+        for code, index in enumerate(analytics._companies):
+            index.rows = order[bounds[code]:bounds[code + 1]].astype(np.int64)
+        return analytics
+
+    def __len__(self):
+        return self._person.size
+
+    # --- Updates ---
+
+    def add(self, employment):
+        """Appends an employment dictionary's stint."""
+        with self._lock:
+            person = self._person_codes.get(employment['person_id'])
+            if person is None:
+                person = self._person_codes[employment['person_id']] = self._person_ids.size
+                self._person_ids.append(employment['person_id'])
+            company = self._company_names.code(employment['company_name'])
+            if company == len(self._companies):
+                self._companies.append(_CompanyIndex())
+            row = self._person.size
+            self._person.append(person)
+            self._company.append(company)
+            self._start.append(_day(employment['start_date']))
+            self._end.append(_day(employment['end_date']) if employment['end_date'] is not None else NO_END)
+            self._companies[company].add(row)
+            self._transitions = None
+
+    # --- Queries ---
+
+    def company_names(self):
+        """Returns every company name, largest current headcount first."""
+        with self._lock:
+            current = np.bincount(self._company.view()[self._end.view() == NO_END], minlength=len(self._companies))
+            order = np.argsort(-current, kind='stable')
+            return [self._company_names[code] for code in order]
+
+    def _index(self, company_name):
+        code = self._company_names.get(company_name)
+        if code is None:
+            return None
+        index = self._companies[code]
+        index.prepare(self._start.data, self._end.data)
+        return index
+
+    def who_was_at(self, company_name, first_date, last_date=None):
+        """
+        Returns the people with a stint at the company covering first_date,
+        or any day from first_date through last_date: a DataFrame with
+        columns person_id, start_date and end_date (NaT while ongoing), one
+        row per person (their earliest such stint), ordered by start date.
+        """
+        with self._lock:
+            index = self._index(company_name)
+            if index is None:
+                return pd.DataFrame(columns=["person_id", "start_date", "end_date"])
+            last_date = last_date or first_date
+            rows = index.overlapping(_day(first_date), _day(last_date), self._start.data, self._end.data)
+            people = self._person.data[rows]
+            _, first = np.unique(people, return_index=True)
+            rows = rows[np.sort(first)]
+            return pd.DataFrame({
+                "person_id": self._person_ids.data[self._person.data[rows]],
+                "start_date": as_dates(self._start.data[rows]),
+                "end_date": as_dates(self._end.data[rows]),
+            })
+
+    def headcount(self, company_name, dates):
+        """Returns the company's headcount (stints) on each of the given dates, as an int array."""
+        with self._lock:
+            days = as_days(dates).astype(np.int64)
+            index = self._index(company_name)
+            if index is None:
+                return np.zeros(len(days), dtype=np.int64)
+            return index.headcount_on(days, self._start.data, self._end.data)
+
+    def headcount_series(self, company_names, first_date, last_date, freq="MS"):
+        """
+        Returns headcount over time as a DataFrame indexed by date (one row
+        per period start of pandas frequency freq, monthly by default) with
+        a column per company, ready to chart.
+        """
+        dates = pd.date_range(first_date, last_date, freq=freq)
+        return pd.DataFrame({name: self.headcount(name, dates.values) for name in company_names}, index=dates)
+
+    def _moves(self):
+        """Returns (from company, to company, move day) arrays, one entry per change of company."""
+        if self._transitions is None:
+            person, company, start = self._person.view(), self._company.view(), self._start.view()
+            order = np.lexsort((np.arange(len(person)), start, person))  # each person's stints by start
+            person, company, start = person[order], company[order], start[order]
+            moved = (person[1:] == person[:-1]) & (company[1:] != company[:-1])
+            self._transitions = (company[:-1][moved], company[1:][moved], start[1:][moved])
+        return self._transitions
+
+    def alumni_flow(self, company_names=None, first_date=None, last_date=None):
+        """
+        Counts moves from one company to the next in people's careers (a move
+        from X to Y is a stint at Y following a stint at X, dated by Y's
+        start). Restricted to moves dated within [first_date, last_date] when
+        given. Returns a DataFrame of from_company, to_company and people,
+        largest first. With company_names, only moves out of those companies
+        are counted.
+        """
+        with self._lock:
+            origin, destination, day = self._moves()
+            keep = np.ones(len(day), dtype=bool)
+            if first_date is not None:
+                keep &= day >= _day(first_date)
+            if last_date is not None:
+                keep &= day <= _day(last_date)
+            if company_names is not None:
+                codes = [code for code in map(self._company_names.get, company_names) if code is not None]
+                keep &= np.isin(origin, codes)
+            pairs = origin[keep].astype(np.int64) * len(self._companies) + destination[keep]
+            pairs, counts = np.unique(pairs, return_counts=True)
+            order = np.argsort(-counts, kind='stable')
+            pairs, counts = pairs[order], counts[order]
+            return pd.DataFrame({
+                "from_company": self._company_names.take(pairs // max(len(self._companies), 1)),
+                "to_company": self._company_names.take(pairs % max(len(self._companies), 1)),
+                "people": counts,
+            })
+
+    def alumni_flow_matrix(self, company_names, first_date=None, last_date=None):
+        """
+        Returns the alumni flow between the given companies as a matrix
+        (rows: from, columns: to), with an "Elsewhere" column for moves to
+        any other company.
+        """
+        flows = self.alumni_flow(company_names, first_date, last_date)
+        to_company = flows['to_company'].where(flows['to_company'].isin(company_names), "Elsewhere")
+        matrix = pd.crosstab(flows['from_company'], to_company, values=flows['people'], aggfunc="sum")
+        columns = list(company_names) + ["Elsewhere"]
+        return matrix.reindex(index=list(company_names), columns=columns).fillna(0).astype(np.int64)
+
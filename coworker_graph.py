@@ -0,0 +1,280 @@
+import threading
+from datetime import date
+
+import numpy as np
+
+from overlap import EPOCH_ORDINAL, NO_END
+
+# calculate_overlap_years rounds to 2 decimals, so a pair of stints counts as
+# overlapping from 2 shared days on (1 day rounds to 0.0 years). Stint i is
+# turned into the closed interval [start, end - MIN_OVERLAP_DAYS]: two stints
+# overlap iff their intervals intersect.
+MIN_OVERLAP_DAYS = 2
+# (company code, day) pairs pack into one sortable int64
+_DAY_OFFSET = 2 ** 31
+_COMPANY_STRIDE = 2 ** 33
+
+
+def _gather(offsets, values, keys):
+    """Concatenates values[offsets[key]:offsets[key + 1]] for every key (CSR row gather)."""
+    starts, stops = offsets[keys], offsets[keys + 1]
+    lengths = stops - starts
+    total = int(lengths.sum())
+    if not total:
+        return np.empty(0, dtype=values.dtype)
+    shifts = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    return values[np.arange(total) + shifts]
+
+
+class CoworkerGraph:
+    """
+    Weighted "who overlapped with whom" graph over the people in an
+    OverlapEngine, without materializing its edges.
+
+    Two people are joined when they had overlapping stints at the same
+    company (company_name exactly as entered, as in Shared Work History).
+    An edge's weight is the summed calculate_overlap_years over every such
+    pair of stints. Edge counts grow with the square of company sizes,
+    which on real, power-law shaped data is far beyond memory. So queries
+    work from the engine's employment columns instead:
+
+    - strongest_connections() groups one person's OverlapEngine.overlapping()
+      pairs by person, like Shared Work History;
+    - warm_intro_path() runs a breadth-first search one hop at a time
+      over CSR lists of stints per person and per company (built on first
+      use, rebuilt after writes);
+    - components come from a union-find over person codes, seeded by one
+      sweep per company (stints chained by overlap are connected) and then
+      kept up to date by add_employment().
+
+    The engine is shared, not copied: the store adds a row to the engine
+    first and then calls add_employment(). Overlaps with ongoing stints count
+    up to today for connections and paths. For components they count up to
+    `as_of` (the first component query's date) for the stints present then,
+    and up to the insertion date for stints added later. Safe to share
+    between threads.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.as_of = date.today()
+        self._lock = threading.RLock()
+        self._lists = None   # (rows covered, person offsets, rows by person, company offsets, rows by company)
+        self._parent = None  # union-find over person codes, built on first component query
+        self._size = None
+
+    # --- Updates ---
+
+    def add_person(self, person_id):
+        """Registers a person already added to the engine as an isolated node."""
+        with self._lock:
+            if self._parent is not None:
+                self._grow()
+
+    def add_employment(self, employment):
+        """Merges the components joined by a stint already added to the engine."""
+        with self._lock:
+            if self._parent is None:
+                return
+            self._grow()
+            engine = self.engine
+            stint = (employment['company_name'], employment['start_date'], employment['end_date'])
+            pairs = engine.overlapping([stint], exclude_person_id=employment['person_id'], today=date.today())
+            code = engine.person_code(employment['person_id'])
+            for other_id in pairs['person_id'].unique():
+                self._union(code, engine.person_code(other_id))
+
+    # --- Union-find ---
+
+    def _grow(self):
+        old = len(self._parent)
+        new = self.engine.num_person_codes()
+        if new > old:
+            self._parent = np.concatenate([self._parent, np.arange(old, new)])
+            self._size = np.concatenate([self._size, np.ones(new - old, dtype=np.int64)])
+
+    def _find(self, code):
+        parent = self._parent
+        while parent[code] != code:
+            parent[code] = parent[parent[code]]  # path halving
+            code = parent[code]
+        return code
+
+    def _union(self, a, b):
+        a, b = self._find(a), self._find(b)
+        if a == b:
+            return
+        if self._size[a] < self._size[b]:
+            a, b = b, a
+        self._parent[b] = a
+        self._size[a] += self._size[b]
+        self._size[b] = 0
+
+    def _components(self):
+        """Builds the union-find from all stints: one sweep per company, then label propagation."""
+        if self._parent is not None:
+            return
+        self.as_of = date.today()
+        person, company, start, last = self._intervals(self.as_of)
+        num_codes = self.engine.num_person_codes()
+        rows = np.flatnonzero(last >= start)
+        rows = rows[np.lexsort((start[rows], company[rows]))]
+        company, start, last, person = company[rows].astype(np.int64), start[rows], last[rows], person[rows]
+        # Sorted by (company, start), a stint starts a new group unless it begins
+        # before the latest interval end so far at its company
+        reach = np.maximum.accumulate(company * _COMPANY_STRIDE + last + _DAY_OFFSET)
+        new_group = np.ones(len(rows), dtype=bool)
+        new_group[1:] = company[1:] * _COMPANY_STRIDE + start[1:] + _DAY_OFFSET > reach[:-1]
+        group = np.cumsum(new_group) - 1
+
+        # Components of the bipartite person-group graph: propagate the
+        # smallest person code until nothing changes
+        labels = np.arange(num_codes)
+        group_starts = np.flatnonzero(new_group)
+        by_person = np.argsort(person, kind='stable')
+        person_sorted = person[by_person]
+        person_starts = np.flatnonzero(np.r_[True, person_sorted[1:] != person_sorted[:-1]]) if len(rows) else []
+        while len(rows):
+            group_labels = np.minimum.reduceat(labels[person], group_starts)
+            best = np.minimum.reduceat(group_labels[group[by_person]], person_starts)
+            updated = labels.copy()
+            updated[person_sorted[person_starts]] = np.minimum(labels[person_sorted[person_starts]], best)
+            updated = updated[updated]  # jump to the label's label
+            if np.array_equal(updated, labels):
+                break
+            labels = updated
+        self._parent = labels
+        self._size = np.bincount(labels, minlength=num_codes)
+
+    # --- Stint lists ---
+
+    def _intervals(self, as_of):
+        """Returns person codes, company name codes, start days and last days (end - MIN_OVERLAP_DAYS) of all rows."""
+        person, company, start, end = self.engine.day_columns()
+        today = as_of.toordinal() - EPOCH_ORDINAL
+        last = np.where(end == NO_END, today, end).astype(np.int64) - MIN_OVERLAP_DAYS
+        return person, company, start.astype(np.int64), last
+
+    def _stint_lists(self):
+        """Returns CSR lists (offsets, rows) of stints per person code and per company name code (by start)."""
+        engine = self.engine
+        if self._lists is None or self._lists[0] != len(engine):
+            person, company, start, _ = engine.day_columns()
+            by_person = np.argsort(person, kind='stable')
+            by_company = np.lexsort((start, company))
+            self._lists = (
+                len(person),
+                np.searchsorted(person[by_person], np.arange(engine.num_person_codes() + 1)), by_person,
+                np.searchsorted(company[by_company], np.arange(engine.num_company_names() + 1)), by_company,
+            )
+        return self._lists
+
+    # --- Queries ---
+
+    def num_people(self):
+        return self.engine.num_people()
+
+    def strongest_connections(self, person_id, k=10):
+        """Returns the k (person_id, overlap_years) neighbours with the largest weights."""
+        engine = self.engine
+        with self._lock:
+            code = engine.person_code(person_id)
+            if code is None:
+                return []
+            stints = [engine.employment(row)[1:] for row in engine.rows_for(code)]
+            pairs = engine.overlapping(stints, exclude_person_id=person_id)
+        if pairs.empty:
+            return []
+        weights = pairs.groupby("person_id", sort=False)["overlap_years"].sum().round(2)
+        top = weights.sort_values(ascending=False, kind="stable").head(k)
+        return list(zip(top.index.tolist(), top.tolist()))
+
+    def warm_intro_path(self, person_id, company_name, max_hops=6):
+        """
+        Returns the shortest chain of person ids from person_id to anyone with an
+        ongoing stint at company_name (fewest hops), or None if there is none
+        within max_hops. The path starts with person_id and ends at the target.
+        """
+        engine = self.engine
+        with self._lock:
+            source = engine.person_code(person_id)
+            target_company = engine.company_name_code(company_name)
+            if source is None or target_company is None:
+                return None
+            _, person_offsets, by_person, company_offsets, by_company = self._stint_lists()
+            person, company, start, last = self._intervals(date.today())
+        _, _, _, end = engine.day_columns()
+
+        at_target = _gather(company_offsets, by_company, np.array([target_company]))
+        is_target = np.zeros(len(person_offsets) - 1, dtype=bool)
+        is_target[person[at_target[end[at_target] == NO_END]]] = True
+        if not is_target.any():
+            return None
+        previous = np.full(len(person_offsets) - 1, -2, dtype=np.int64)  # -2: not reached yet
+        previous[source] = -1
+        if is_target[source]:
+            return [person_id]
+
+        frontier = np.array([source])
+        for _ in range(max_hops):
+            # The frontier's stints, sorted by (company, start), with the running
+            # latest end per company and the stint that reaches it
+            rows = _gather(person_offsets, by_person, frontier)
+            rows = rows[last[rows] >= start[rows]]
+            if not len(rows):
+                return None
+            rows = rows[np.lexsort((start[rows], company[rows]))]
+            frontier_company = company[rows].astype(np.int64)
+            keys = frontier_company * _COMPANY_STRIDE + start[rows] + _DAY_OFFSET
+            ends = frontier_company * _COMPANY_STRIDE + last[rows] + _DAY_OFFSET
+            reach = np.maximum.accumulate(ends)
+            witness = np.maximum.accumulate(np.where(ends == reach, np.arange(len(rows)), 0))
+
+            # Everyone else's stints at those companies that overlap one of them
+            candidates = _gather(company_offsets, by_company, np.unique(company[rows]))
+            candidates = candidates[(previous[person[candidates]] == -2) & (last[candidates] >= start[candidates])]
+            candidate_company = company[candidates].astype(np.int64)
+            index = np.searchsorted(keys, candidate_company * _COMPANY_STRIDE + last[candidates] + _DAY_OFFSET,
+                                    side='right') - 1
+            safe = np.maximum(index, 0)
+            overlaps = ((index >= 0) & (frontier_company[safe] == candidate_company)
+                        & (reach[safe] >= candidate_company * _COMPANY_STRIDE + start[candidates] + _DAY_OFFSET))
+            candidates, index = candidates[overlaps], index[overlaps]
+            if not len(candidates):
+                return None
+            reached, first = np.unique(person[candidates], return_index=True)
+            previous[reached] = person[rows[witness[index[first]]]]
+
+            hits = reached[is_target[reached]]
+            if len(hits):
+                path = [int(hits[0])]
+                while previous[path[-1]] >= 0:
+                    path.append(int(previous[path[-1]]))
+                return [engine.person_id(code) for code in reversed(path)]
+            frontier = reached
+        return None
+
+    def component_id(self, person_id):
+        """Returns an id shared by everyone in the person's connected component."""
+        with self._lock:
+            code = self.engine.person_code(person_id)
+            if code is None:
+                return None
+            self._components()
+            return self.engine.person_id(self._find(code))
+
+    def component_size(self, person_id):
+        """Returns how many people are reachable from person_id (including them)."""
+        with self._lock:
+            code = self.engine.person_code(person_id)
+            if code is None:
+                return 0
+            self._components()
+            return int(self._size[self._find(code)])
+
+    def components(self):
+        """Returns {component id: size} for every connected component."""
+        with self._lock:
+            self._components()
+            roots = np.flatnonzero(self._size > 0)
+            return {self.engine.person_id(root): int(self._size[root]) for root in roots}
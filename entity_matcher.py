@@ -0,0 +1,136 @@
+import re
+from collections import defaultdict
+from heapq import nlargest
+
+from overlap import normalize_company_name
+
+# Legal-form tokens ignored when matching company names ("D1 Capital Partners
+# L.P." and "D1 Capital Partners" are the same firm for our purposes).
+COMPANY_SUFFIXES = {"lp", "llc", "llp", "inc", "ltd", "limited", "corp", "corporation",
+                    "co", "plc", "gmbh", "ag", "sa", "the"}
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def normalize_person_name(name):
+    """Lowercases a person's name and strips punctuation and extra whitespace."""
+    return " ".join(_PUNCTUATION.sub(" ", name.replace(".", "")).split()).casefold()
+
+
+def normalize_company_for_matching(name):
+    """Like normalize_company_name, but also drops punctuation and legal-form suffixes."""
+    tokens = _PUNCTUATION.sub(" ", normalize_company_name(name).replace(".", "")).split()
+    return " ".join(token for token in tokens if token not in COMPANY_SUFFIXES)
+
+
+def trigrams(text):
+    """Returns the set of character trigrams of a normalized string, padded at word edges."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameMatcher:
+    """
+    Fuzzy name lookup backed by a normalized-name map and a trigram inverted index.
+
+    Candidates for a query are only the entries sharing at least one of its
+    rarer trigrams, scored by Dice similarity of the trigram sets, so a lookup
+    never compares the query against every stored name.
+    """
+
+    def __init__(self, normalize, max_posting_fraction=0.05):
+        self._normalize = normalize
+        self._max_posting_fraction = max_posting_fraction
+        self._exact = defaultdict(list)     # normalized name -> [key, ...]
+        self._postings = defaultdict(list)  # trigram -> [entry index, ...]
+        self._entries = []                  # (key, display name, trigram count)
+        self._display = {}                  # key -> display name
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, key, name):
+        """Indexes a name under a key (e.g. a person id); duplicate keys are ignored."""
+        if key in self._display:
+            return
+        normalized = self._normalize(name)
+        if not normalized:
+            return
+        self._display[key] = name
+        grams = trigrams(normalized)
+        entry = len(self._entries)
+        self._entries.append((key, name, len(grams)))
+        self._exact[normalized].append(key)
+        for gram in grams:
+            self._postings[gram].append(entry)
+
+    def match(self, name, limit=5, min_score=0.5):
+        """
+        Returns up to `limit` (key, display name, score) candidates, best first.
+        Exact normalized matches score 1.0; others score the trigram Dice
+        coefficient and must reach min_score.
+        """
+        normalized = self._normalize(name)
+        if not normalized:
+            return []
+        exact = self._exact.get(normalized, [])
+        results = [(key, self._display[key], 1.0) for key in exact[:limit]]
+        if len(results) >= limit:
+            return results
+
+        grams = trigrams(normalized)
+        # Very common trigrams barely discriminate and have the longest postings;
+        # skip them unless they are all the query has.
+        max_posting = max(int(len(self._entries) * self._max_posting_fraction), 50)
+        postings = sorted((self._postings[gram] for gram in grams if gram in self._postings), key=len)
+        selective = [posting for posting in postings if len(posting) <= max_posting] or postings[:1]
+        shared = defaultdict(int)
+        for posting in selective:
+            for entry in posting:
+                shared[entry] += 1
+
+        # The count from selective postings is a lower bound; rescore the
+        # strongest candidates exactly.
+        exact_keys = set(exact)
+        scored = []
+        for entry in nlargest(limit * 10, shared, key=shared.get):
+            key, display, size = self._entries[entry]
+            if key in exact_keys:
+                continue
+            overlap = len(grams & trigrams(self._normalize(display)))
+            score = 2 * overlap / (len(grams) + size)
+            if score >= min_score:
+                scored.append((key, display, round(score, 3)))
+        scored.sort(key=lambda item: -item[2])
+        return results + scored[:limit - len(results)]
+
+
+class EntityResolver:
+    """Matches extracted PERSON/ORG strings to stored profiles and company names."""
+
+    def __init__(self, people=(), employments=()):
+        self.people = NameMatcher(normalize_person_name)
+        self.companies = NameMatcher(normalize_company_for_matching)
+        for person in people:
+            self.add_person(person)
+        for employment in employments:
+            self.add_employment(employment)
+
+    def add_person(self, person):
+        self.people.add(person['id'], person['name'])
+        if person.get('current_company_name'):
+            self.add_company(person['current_company_name'])
+
+    def add_employment(self, employment):
+        self.add_company(employment['company_name'])
+
+    def add_company(self, company_name):
+        # Keyed by the exact spelling so each variant stays selectable
+        self.companies.add(company_name, company_name)
+
+    def match_person(self, name, limit=5, min_score=0.5):
+        """Returns [(person id, name, score), ...] best first."""
+        return self.people.match(name, limit=limit, min_score=min_score)
+
+    def match_company(self, name, limit=5, min_score=0.5):
+        """Returns [(company name, company name, score), ...] best first."""
+        return self.companies.match(name, limit=limit, min_score=min_score)
@@ -0,0 +1,109 @@
+import contextlib
+import io
+import threading
+
+import numpy as np
+import pandas as pd
+
+from bulk_import import EMPLOYMENT_COLUMNS, PEOPLE_COLUMNS
+from overlap import EPOCH_ORDINAL
+
+EXPORT_FORMATS = {
+    # format -> (file extension, MIME type)
+    "csv": ("csv", "text/csv"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+EXPORT_FILE_NAMES = {"people": "professional_profiles", "employments": "employment_history"}
+CSV_CHUNKSIZE = 100_000
+_NAT = np.iinfo(np.int64).min  # int64 value of NaT
+
+
+def people_frame(store):
+    """Returns every person as a DataFrame in the professional_profiles.csv layout."""
+    if hasattr(store, "person_columns"):  # columnar stores skip the per-row records
+        return pd.DataFrame(store.person_columns(), columns=PEOPLE_COLUMNS)
+    return pd.DataFrame.from_records(store.people(), columns=PEOPLE_COLUMNS).fillna('')
+
+
+def employments_frame(store):
+    """
+    Returns every employment as a DataFrame in the employment_history.csv
+    layout, with start_date/end_date as datetime64 columns (NaT while ongoing).
+    """
+    if hasattr(store, "employment_columns"):
+        columns = store.employment_columns()
+        for column in ("start_date", "end_date"):
+            columns[column] = columns[column].astype("datetime64[s]")
+        return pd.DataFrame(columns, columns=EMPLOYMENT_COLUMNS)
+    employments = store.employments()
+    columns = {column: [e[column] for e in employments] for column in EMPLOYMENT_COLUMNS}
+    for column in ("start_date", "end_date"):
+        columns[column] = _date_column(columns[column])
+    return pd.DataFrame(columns, columns=EMPLOYMENT_COLUMNS)
+
+
+def _date_column(dates):
+    """Converts dates (None for missing) to datetime64 via their ordinals, much faster than np.array(dates)."""
+    days = np.fromiter((d.toordinal() - EPOCH_ORDINAL if d is not None else _NAT for d in dates),
+                       dtype=np.int64, count=len(dates))
+    return days.view("datetime64[D]").astype("datetime64[s]")
+
+
+def to_csv_bytes(df):
+    """Encodes a frame as UTF-8 CSV; dates as YYYY-MM-DD and missing end dates as "Present"."""
+    df = df.copy()
+    for column in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[column]):
+            values = df[column].to_numpy().astype("datetime64[D]")
+            df[column] = np.where(np.isnat(values), "Present", np.datetime_as_string(values, unit="D"))
+    buffer = io.BytesIO()
+    df.to_csv(buffer, index=False, encoding="utf-8", chunksize=CSV_CHUNKSIZE)
+    return buffer.getvalue()
+
+
+def to_parquet_bytes(df):
+    """Encodes a frame as Parquet (dates stay typed, ongoing end dates are null)."""
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+
+_FRAMES = {"people": people_frame, "employments": employments_frame}
+_ENCODERS = {"csv": to_csv_bytes, "parquet": to_parquet_bytes}
+
+
+class ExportCache:
+    """
+    Encoded export files for one store, keyed by (dataset, format) and tagged
+    with the store's data_version() at build time.
+
+    Nothing is serialized until get() is called, and an entry is rebuilt only
+    after a write has moved the data version past the version it was built at.
+    If the store is shared with writers that take a lock, pass it as lock:
+    the data is then read under it (encoding happens after releasing it).
+    """
+
+    def __init__(self, store, lock=None):
+        self.store = store
+        self._entries = {}  # (dataset, format) -> (data version, bytes)
+        self._lock = threading.Lock()
+        self._store_lock = lock if lock is not None else contextlib.nullcontext()
+
+    def cached(self, dataset, fmt):
+        """Returns the encoded export if it is up to date, else None (never builds)."""
+        entry = self._entries.get((dataset, fmt))
+        if entry is not None and entry[0] == self.store.data_version():
+            return entry[1]
+        return None
+
+    def get(self, dataset, fmt):
+        """Returns the encoded export, building it if the data changed since the last build."""
+        with self._lock:
+            data = self.cached(dataset, fmt)
+            if data is None:
+                with self._store_lock:
+                    version = self.store.data_version()
+                    frame = _FRAMES[dataset](self.store)
+                data = _ENCODERS[fmt](frame)
+                self._entries[(dataset, fmt)] = (version, data)
+            return data
@@ -0,0 +1,96 @@
+import threading
+from collections import OrderedDict
+
+from overlap import normalize_company_name
+
+DEFAULT_CACHE_SIZE = 512  # people whose Shared Work History is kept
+
+
+class SharedHistoryCache:
+    """
+    Least-recently-used cache of Shared Work History results, per person.
+
+    An entry depends only on employments at the person's own companies, so
+    a new employment at company C invalidates just the people with a stint
+    at C (and the employment's own person). Entries hold the rows without
+    current_company_name, which the store fills in on every read, so
+    profile edits never leave an entry stale.
+
+    A result involving an ongoing stint of the person (or one ending in the
+    future) counts overlap up to today, so it is only reused on the day it
+    was computed. Safe to share between threads.
+    """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # person id -> (rows, company keys, valid on date or None)
+        self._people_by_company = {}   # company key -> person ids with an entry
+        self._generation = 0           # bumped by every invalidation
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def generation(self):
+        """Returns a token to pass to put(), taken before computing the result."""
+        return self._generation
+
+    def get(self, person_id, today):
+        """Returns the cached rows of a person (do not modify them), or None."""
+        with self._lock:
+            entry = self._entries.get(person_id)
+            if entry is not None and entry[2] not in (None, today):
+                self._remove(person_id)  # computed on an earlier day
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(person_id)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, person_id, rows, stints, today, generation):
+        """
+        Caches the rows computed for a person whose stints are (company name,
+        start date, end date or None) tuples, unless something was invalidated
+        since generation() was taken (the rows may predate that write).
+        """
+        companies = {normalize_company_name(stint[0]) for stint in stints}
+        depends_on_today = any(end is None or end > today for _, _, end in stints)
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._remove(person_id)
+            self._entries[person_id] = (rows, companies, today if depends_on_today else None)
+            for company in companies:
+                self._people_by_company.setdefault(company, set()).add(person_id)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_employment(self, employment):
+        """Drops the entries a new employment can change: its person and everyone at its company."""
+        with self._lock:
+            self._generation += 1
+            self._remove(employment['person_id'])
+            for person_id in list(self._people_by_company.get(normalize_company_name(employment['company_name']), ())):
+                self._remove(person_id)
+
+    def clear(self):
+        """Drops every entry (e.g. after a rename, since names decide dedup and order)."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._people_by_company.clear()
+
+    def _remove(self, person_id):
+        entry = self._entries.pop(person_id, None)
+        if entry is None:
+            return
+        for company in entry[1]:
+            people = self._people_by_company.get(company)
+            if people is not None:
+                people.discard(person_id)
+                if not people:
+                    del self._people_by_company[company]
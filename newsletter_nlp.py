@@ -0,0 +1,98 @@
+import os
+import zipfile
+
+SPACY_MODEL = "en_core_web_sm"
+ENTITY_LABELS = ("PERSON", "ORG")
+# Components entity recognition never uses; excluded so their weights are never loaded
+NON_NER_PIPES = ("tagger", "morphologizer", "parser", "attribute_ruler", "lemmatizer", "senter", "sentencizer")
+# Shared embedding components, kept only when NER listens to them
+SHARED_EMBEDDING_PIPES = ("tok2vec", "transformer")
+# Below this many documents the start-up cost of worker processes outweighs the gain
+MIN_DOCS_PER_PROCESS = 20
+
+
+def iter_newsletter_texts(uploaded_files):
+    """
+    Yields (document name, text) for uploaded .txt files and for every .txt
+    member of uploaded .zip archives. Files are decoded as UTF-8, ignoring
+    undecodable bytes, and read one at a time.
+    """
+    for uploaded in uploaded_files:
+        name = getattr(uploaded, "name", str(uploaded))
+        if name.lower().endswith(".zip"):
+            with zipfile.ZipFile(uploaded) as archive:
+                for member in archive.infolist():
+                    if member.is_dir() or not member.filename.lower().endswith(".txt"):
+                        continue
+                    if os.path.basename(member.filename).startswith("."):
+                        continue  # macOS resource forks and other hidden files
+                    text = archive.read(member).decode("utf-8", errors="ignore")
+                    yield f"{name}/{member.filename}", text
+        else:
+            yield name, uploaded.read().decode("utf-8", errors="ignore")
+
+
+def count_newsletter_documents(uploaded_files):
+    """Counts the documents iter_newsletter_texts() will yield, without decoding them."""
+    total = 0
+    for uploaded in uploaded_files:
+        name = getattr(uploaded, "name", str(uploaded))
+        if name.lower().endswith(".zip"):
+            with zipfile.ZipFile(uploaded) as archive:
+                total += sum(
+                    1 for member in archive.infolist()
+                    if not member.is_dir() and member.filename.lower().endswith(".txt")
+                    and not os.path.basename(member.filename).startswith(".")
+                )
+            uploaded.seek(0)
+        else:
+            total += 1
+    return total
+
+
+def load_ner_model(name=SPACY_MODEL):
+    """
+    Imports spaCy and loads pipeline `name` with only what named entity
+    recognition needs. spaCy is imported here rather than at module level,
+    so nothing NLP-related is paid until a model is actually requested.
+    """
+    import spacy
+
+    nlp = spacy.load(name, exclude=NON_NER_PIPES)
+    for pipe in SHARED_EMBEDDING_PIPES:
+        if pipe in nlp.pipe_names and not _feeds_ner(nlp, pipe):
+            nlp.remove_pipe(pipe)
+    return nlp
+
+
+def extract_entities(nlp, named_texts, batch_size=32, n_process=1, labels=ENTITY_LABELS):
+    """
+    Runs named entity recognition over (name, text) pairs with nlp.pipe and
+    yields (name, {label: sorted unique entity texts}) as each document is
+    done, in input order.
+
+    Every pipeline component except NER (and anything it listens to) is
+    disabled. n_process > 1 fans batches out to worker processes.
+    """
+    disabled = [pipe for pipe in nlp.pipe_names if pipe != "ner" and not _feeds_ner(nlp, pipe)]
+    text_tuples = ((text, name) for name, text in named_texts)
+    docs = nlp.pipe(text_tuples, as_tuples=True, batch_size=batch_size, n_process=n_process, disable=disabled)
+    for doc, name in docs:
+        entities = {label: set() for label in labels}
+        for ent in doc.ents:
+            if ent.label_ in entities:
+                entities[ent.label_].add(ent.text.strip())
+        yield name, {label: sorted(texts) for label, texts in entities.items()}
+
+
+def _feeds_ner(nlp, pipe_name):
+    """True if NER listens to this component (a shared tok2vec/transformer)."""
+    if "ner" not in nlp.pipe_names:
+        return False
+    listeners = getattr(nlp.get_pipe(pipe_name), "listening_components", ())
+    return "ner" in listeners
+
+
+def default_process_count(num_docs):
+    """Worker processes for a batch: one per MIN_DOCS_PER_PROCESS documents, capped at the CPU count."""
+    return max(1, min(os.cpu_count() or 1, num_docs // MIN_DOCS_PER_PROCESS))
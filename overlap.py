@@ -0,0 +1,336 @@
+from array import array
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from columns import GrowableArray, StringPool
+from profiling import counted
+
+DAYS_PER_YEAR = 365.25
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+NO_END = np.iinfo(np.int32).min  # int32 end day of an ongoing stint
+BLOCK = 64  # ended stints per block of a company's max-end index
+
+
+@counted
+def calculate_overlap_years(start1, end1, start2, end2):
+    """
+    Calculates the overlapping years between two date ranges.
+    Treats None as 'present' (up to current date).
+    """
+    today = date.today()
+    period1_end = end1 if end1 is not None else today
+    period2_end = end2 if end2 is not None else today
+
+    # Find the later of the two start dates
+    latest_start = max(start1, start2)
+    # Find the earlier of the two end dates
+    earliest_end = min(period1_end, period2_end)
+
+    overlap_days = (earliest_end - latest_start).days
+    if overlap_days <= 0:
+        return 0.0 # No overlap or invalid overlap
+    return round(overlap_days / 365.25, 2) # Account for leap years
+
+
+def normalize_company_name(name):
+    """Normalizes a company name for matching (case and whitespace insensitive)."""
+    return " ".join(name.split()).casefold()
+
+
+@counted
+def overlap_years(start1, end1, start2, end2, today=None):
+    """
+    Vectorized calculate_overlap_years over datetime64[D] arrays.
+
+    NaT end dates are treated as 'present' (today). Returns a float array
+    rounded to 2 decimals, with 0.0 wherever the ranges do not overlap.
+    """
+    today = np.datetime64(today or date.today(), 'D')
+    end1 = np.where(np.isnat(end1), today, end1)
+    end2 = np.where(np.isnat(end2), today, end2)
+    overlap_days = (np.minimum(end1, end2) - np.maximum(start1, start2)).astype(np.int64)
+    return np.where(overlap_days > 0, np.round(overlap_days / DAYS_PER_YEAR, 2), 0.0)
+
+
+def as_dates(days):
+    """Converts int32 days since the epoch (NO_END for ongoing) to datetime64[D] with NaT."""
+    dates = days.astype('datetime64[D]')
+    dates[days == NO_END] = np.datetime64('NaT')
+    return dates
+
+
+def as_days(dates):
+    """Converts dates or datetime64 values (NaT for ongoing) to int32 days since the epoch with NO_END."""
+    days = np.asarray(dates, dtype='datetime64[D]')
+    return np.where(np.isnat(days), NO_END, days.astype(np.int64)).astype(np.int32)
+
+
+class OverlapEngine:
+    """
+    Columnar employment table with a batched Shared Work History computation.
+
+    Employments are held as parallel numpy columns (int32 person and
+    company codes, int32 start/end days since the epoch with NO_END for
+    ongoing stints, and the company name as entered, dictionary-encoded).
+    For each company the ended stints are kept sorted by start date with
+    the latest end date of every BLOCK of them (a max-end segment tree
+    flattened to its leaf level), and the ongoing ones sorted by start date.
+    So a stint's candidates are the blocks that can hold an overlap plus a
+    searchsorted prefix of the ongoing stints, roughly its actual
+    co-employees rather than everyone who ever worked there, and the
+    overlap arithmetic, dedup and sort run over all pairs at once.
+    """
+
+    def __init__(self):
+        self._person_codes = {}   # person id -> code
+        self._person_ids = GrowableArray(object)
+        self._names = GrowableArray(object)  # None until the person is added
+        self._position = GrowableArray(np.int64)  # person code -> add_person() order, -1 until added
+        self._num_added = 0
+        self._first_row = GrowableArray(np.int32)  # person code -> first row, -1 if none
+        self._last_row = GrowableArray(np.int32)   # person code -> last row, -1 if none
+        self._company_codes = {}  # normalized company name -> code
+        self._company_name_pool = StringPool()  # company names as entered
+        self._person = GrowableArray(np.int32)
+        self._company = GrowableArray(np.int32)
+        self._start = GrowableArray(np.int32)
+        self._end = GrowableArray(np.int32)
+        self._company_name = GrowableArray(np.int32)  # code in _company_name_pool
+        self._next_row = GrowableArray(np.int32)      # next row of the same person, -1 at the end
+        self._rows_by_company = {}  # company code -> array('i') of rows
+        self._sorted_company = {}   # company code -> overlap index, see _company_rows
+
+    def __len__(self):
+        return self._person.size
+
+    def _person_code(self, person_id):
+        code = self._person_codes.get(person_id)
+        if code is None:
+            code = self._person_codes[person_id] = self._person_ids.size
+            self._person_ids.append(person_id)
+            self._names.append(None)
+            self._position.append(-1)
+            self._first_row.append(-1)
+            self._last_row.append(-1)
+        return code
+
+    def _person_rows(self, code):
+        """Yields the rows of a person code in insertion order."""
+        row = self._first_row.data[code] if code is not None else -1
+        while row >= 0:
+            yield int(row)
+            row = self._next_row.data[row]
+
+    def add_person(self, person_id, name):
+        """Registers a person's display name (used for dedup and output); later calls rename them."""
+        code = self._person_code(person_id)
+        self._names.data[code] = name
+        if self._position.data[code] < 0:
+            self._position.data[code] = self._num_added
+            self._num_added += 1
+
+    def add_employment(self, employment):
+        """Appends an employment dictionary to the columns."""
+        row = self._person.size
+        person = self._person_code(employment['person_id'])
+        company_key = normalize_company_name(employment['company_name'])
+        company = self._company_codes.setdefault(company_key, len(self._company_codes))
+        self._person.append(person)
+        self._company.append(company)
+        self._start.append(employment['start_date'].toordinal() - EPOCH_ORDINAL)
+        self._end.append(employment['end_date'].toordinal() - EPOCH_ORDINAL if employment['end_date'] is not None
+                         else NO_END)
+        self._company_name.append(self._company_name_pool.code(employment['company_name']))
+        self._next_row.append(-1)
+        if self._last_row.data[person] >= 0:
+            self._next_row.data[self._last_row.data[person]] = row
+        else:
+            self._first_row.data[person] = row
+        self._last_row.data[person] = row
+        self._rows_by_company.setdefault(company, array('i')).append(row)
+        self._sorted_company.pop(company, None)
+
+    # --- Column access for stores that keep their data here ---
+
+    def person_code(self, person_id):
+        """Returns the integer surrogate key of a person id, or None if it is unknown."""
+        return self._person_codes.get(person_id)
+
+    def person_id(self, code):
+        return self._person_ids.data[code]
+
+    def person_order(self, person_id):
+        """Returns the position of a person in add_person() order, or None if never added."""
+        code = self._person_codes.get(person_id)
+        position = self._position.data[code] if code is not None else -1
+        return int(position) if position >= 0 else None
+
+    def num_people(self):
+        """Returns the number of people added with add_person()."""
+        return self._num_added
+
+    def num_person_codes(self):
+        """Returns the number of person codes handed out (people added or referenced by employments)."""
+        return self._person_ids.size
+
+    def name(self, code):
+        return self._names.data[code]
+
+    def rows_for(self, code):
+        """Returns the employment rows of a person code, in insertion order."""
+        return list(self._person_rows(code))
+
+    def employment(self, row):
+        """Returns (person code, company name, start date, end date or None) of a row."""
+        end = int(self._end.data[row])
+        return (int(self._person.data[row]), self._company_name_pool[self._company_name.data[row]],
+                date.fromordinal(int(self._start.data[row]) + EPOCH_ORDINAL),
+                date.fromordinal(end + EPOCH_ORDINAL) if end != NO_END else None)
+
+    def company_names(self):
+        """Returns the distinct company names, as entered, in first-seen order."""
+        return self._company_name_pool.values()
+
+    def company_name_code(self, company_name):
+        """Returns the code of a company name exactly as entered, or None if it is unknown."""
+        return self._company_name_pool.get(company_name)
+
+    def num_company_names(self):
+        return len(self._company_name_pool)
+
+    def columns(self):
+        """
+        Returns the employment columns: person_code, person_id and company_name (object),
+        start_date and end_date (datetime64[D], NaT while ongoing).
+        """
+        return {
+            "person_code": self._person.view(),
+            "person_id": self._person_ids.data[self._person.view()],
+            "company_name": self._company_name_pool.take(self._company_name.view()),
+            "start_date": as_dates(self._start.view()),
+            "end_date": as_dates(self._end.view()),
+        }
+
+    def day_columns(self):
+        """
+        Returns views of the int32 columns person (code), company_name (code, see
+        company_name_code), start and end (days since the epoch, NO_END while ongoing).
+        """
+        size = self._person.size
+        return (self._person.data[:size], self._company_name.data[:size],
+                self._start.data[:size], self._end.data[:size])
+
+    def _company_rows(self, company):
+        """
+        Returns a company's stints indexed for overlap queries, sorted by start
+        date: (ended rows, their start and end dates, the latest end date of
+        every BLOCK of them, ongoing rows, their start dates).
+        """
+        # Rows are only appended, so an entry covering as many rows as the
+        # company has is current (readers outside the writer's lock may have
+        # cached an older one after add_employment dropped it)
+        cached = self._sorted_company.get(company)
+        if cached is None or len(cached[0]) + len(cached[4]) != len(self._rows_by_company[company]):
+            rows = np.frombuffer(self._rows_by_company[company], dtype=np.int32).astype(np.int64)
+            rows = rows[np.argsort(self._start.data[rows], kind='stable')]
+            ongoing = self._end.data[rows] == NO_END
+            ended, current = rows[~ongoing], rows[ongoing]
+            ends = as_dates(self._end.data[ended])
+            block_max_end = (np.maximum.reduceat(ends, np.arange(0, len(ends), BLOCK)) if len(ends)
+                             else np.empty(0, dtype='datetime64[D]'))
+            cached = self._sorted_company[company] = (ended, as_dates(self._start.data[ended]), ends, block_max_end,
+                                                      current, as_dates(self._start.data[current]))
+        return cached
+
+    def overlapping(self, stints, exclude_person_id=None, today=None):
+        """
+        Returns every stored stint overlapping one of the given stints at the
+        same company (company_name exactly as entered), as a DataFrame with
+        columns stint (index into stints), person_order (the other person's
+        add_person() order), other_order (the other stint's row), person_id,
+        name, company_name (the given stint's) and overlap_years.
+
+        Pairs come in the order the original all-pairs scan met them: by
+        person_order, then stint, then other_order. stints are (company
+        name, start date, end date or None) tuples, so they may come from
+        another engine. Pairs with no positive overlap, with
+        exclude_person_id, or with people never added are dropped.
+        """
+        today = np.datetime64(today or date.today(), 'D')
+        start, end = self._start.data, self._end.data
+        stint_parts, other_parts = [], []
+        for index, (company_name, stint_start, stint_end) in enumerate(stints):
+            company = self._company_codes.get(normalize_company_name(company_name))
+            name_code = self._company_name_pool.get(company_name)
+            if company is None or name_code is None:
+                continue
+            ended, starts, ends, block_max_end, current, current_starts = self._company_rows(company)
+            stint_start = np.datetime64(stint_start, 'D')
+            stint_end = today if stint_end is None else np.datetime64(stint_end, 'D')
+            # Ended stints starting before the selected one ends, and ending after it
+            # starts: only blocks whose latest end is after its start can hold one
+            limit = np.searchsorted(starts, stint_end, side='left')
+            blocks = np.flatnonzero(block_max_end[:-(-limit // BLOCK)] > stint_start)
+            positions = (blocks[:, None] * BLOCK + np.arange(BLOCK)).ravel()
+            positions = positions[positions < limit]
+            candidates = ended[positions[ends[positions] > stint_start]]
+            if today > stint_start:
+                # Ongoing stints (counted up to today) starting before it ends
+                limit = np.searchsorted(current_starts, stint_end, side='left')
+                candidates = np.concatenate([candidates, current[:limit]])
+            candidates = candidates[self._company_name.data[candidates] == name_code]
+            stint_parts.append(np.full(len(candidates), index, dtype=np.int64))
+            other_parts.append(candidates)
+
+        if not other_parts:
+            return pd.DataFrame(columns=["stint", "person_order", "other_order", "person_id", "name", "company_name",
+                                         "overlap_years"])
+        stint = np.concatenate(stint_parts)
+        other = np.concatenate(other_parts)
+
+        other_person = self._person.data[other]
+        exclude = self._person_codes.get(exclude_person_id, -1)
+        keep = other_person != exclude
+        stint, other, other_person = stint[keep], other[keep], other_person[keep]
+        stint_starts = np.array([s[1] for s in stints], dtype='datetime64[D]')
+        stint_ends = np.array([s[2] if s[2] is not None else np.datetime64('NaT') for s in stints], dtype='datetime64[D]')
+        years = overlap_years(stint_starts[stint], stint_ends[stint], as_dates(start[other]), as_dates(end[other]), today)
+        names = self._names.data[other_person]
+        keep = (years > 0) & pd.notna(names)
+        stint, other, other_person, names, years = stint[keep], other[keep], other_person[keep], names[keep], years[keep]
+        person_order = self._position.data[other_person]
+        order = np.lexsort((other, stint, person_order))
+
+        return pd.DataFrame({
+            "stint": stint[order],
+            "person_order": person_order[order],
+            "other_order": other[order],
+            "person_id": self._person_ids.data[other_person[order]],
+            "name": names[order],
+            "company_name": np.array([s[0] for s in stints], dtype=object)[stint[order]],
+            "overlap_years": years[order],
+        })
+
+    def shared_history(self, person_id, today=None):
+        """
+        Returns a DataFrame with columns person_id, name, company_name and
+        overlap_years: one row per (other person's name, selected company),
+        exactly as the original all-pairs scan built its table (see
+        summarize_shared_history).
+        """
+        stints = [self.employment(row)[1:] for row in self._person_rows(self._person_codes.get(person_id))]
+        return summarize_shared_history(self.overlapping(stints, exclude_person_id=person_id, today=today))
+
+
+def summarize_shared_history(pairs):
+    """
+    Reduces pairs in the original scan's order (see OverlapEngine.overlapping)
+    to Shared Work History rows: the first pair per (name, company_name),
+    then the same sort_values(ascending=False) on overlap_years the original
+    table used, so rows tied on overlap_years come out in the same order too.
+    """
+    pairs = pairs.drop_duplicates(subset=["name", "company_name"], keep="first")
+    pairs = pairs[["person_id", "name", "company_name", "overlap_years"]].reset_index(drop=True)
+    return pairs.sort_values(by="overlap_years", ascending=False).reset_index(drop=True)
@@ -0,0 +1,296 @@
+import threading
+from datetime import date
+
+import pandas as pd
+
+from entity_matcher import EntityResolver
+from history_cache import SharedHistoryCache
+from overlap import OverlapEngine, normalize_company_name, summarize_shared_history
+from people_index import PeopleIndex
+
+
+class OverlayStore:
+    """
+    A session's private, copy-on-write view of a shared in-memory store.
+
+    Reads see the shared base store plus this session's own writes; writes
+    (new people, new employments, updated person fields) only touch the
+    overlay, so creating a session costs the same whatever the dataset size
+    and nothing is copied until the session writes. commit() replays the
+    overlay into the base under `lock`, making it visible to every session;
+    discard() drops it.
+
+    The base must be a CompactStore (its overlap_engine answers the Shared
+    Work History of overlay stints). Every base access
+    holds `lock`, which must be shared by all overlays of the same base.
+    Known limits until commit: list filters match base people on their shared
+    fields, and the coworker graph and company analytics only contain
+    committed data.
+    """
+
+    def __init__(self, base, lock=None):
+        self.base = base
+        self._lock = lock or threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self._people = {}                 # person id -> new person dict, in insertion order
+        self._updates = {}                # base person id -> updated fields
+        self._employments = []            # new employment dicts, in insertion order
+        self._employments_by_person = {}  # person id -> new employment dicts
+        self._search_index = PeopleIndex()  # positions index the new people
+        self._person_ids = []
+        self.overlap_engine = OverlapEngine()  # new employments only
+        self._overlay_companies = set()  # normalized company names of the new employments
+        self.shared_history_cache = SharedHistoryCache()  # results involving overlay stints
+        self._cache_base_version = None  # base data_version() the cache's entries were computed at
+        self._entity_resolver = None
+        self._version = 0
+
+    # --- Writes (overlay only) ---
+
+    def add_person(self, person):
+        """Adds a person dictionary (must carry a unique 'id') to the overlay."""
+        self._search_index.add(len(self._person_ids), person)
+        self._person_ids.append(person['id'])
+        self._people[person['id']] = person
+        self.overlap_engine.add_person(person['id'], person['name'])
+        if self._entity_resolver is not None:
+            self._entity_resolver.add_person(person)
+        self._version += 1
+
+    def add_employment(self, employment):
+        """Adds an employment dictionary (for a base or overlay person) to the overlay."""
+        person_id = employment['person_id']
+        if self.overlap_engine.person_code(person_id) is None:
+            # A base person's first overlay stint: the engine needs their name
+            self.overlap_engine.add_person(person_id, self.get_person(person_id)['name'])
+        self._employments.append(employment)
+        self._employments_by_person.setdefault(person_id, []).append(employment)
+        self.overlap_engine.add_employment(employment)
+        self._overlay_companies.add(normalize_company_name(employment['company_name']))
+        self.shared_history_cache.invalidate_employment(employment)
+        if self._entity_resolver is not None:
+            self._entity_resolver.add_employment(employment)
+        self._version += 1
+
+    def add_many(self, people=(), employments=()):
+        """Adds people, then employments."""
+        for person in people:
+            self.add_person(person)
+        for employment in employments:
+            self.add_employment(employment)
+
+    def update_person(self, person_id, **fields):
+        """Updates the given fields of a person, copying a base person's changes into the overlay."""
+        if person_id in self._people:
+            position = self._person_ids.index(person_id)
+            self._search_index.update(position, self._people[person_id], fields)
+            self._people[person_id].update(fields)
+            if 'name' in fields:
+                self.overlap_engine.add_person(person_id, fields['name'])
+                self.shared_history_cache.clear()  # names decide dedup and order
+        else:
+            self._updates.setdefault(person_id, {}).update(fields)
+        if self._entity_resolver is not None and fields.get('current_company_name'):
+            self._entity_resolver.add_company(fields['current_company_name'])
+        self._version += 1
+
+    # --- Commit ---
+
+    def pending(self):
+        """Returns (new people, new employments, updated base people) not yet committed."""
+        return len(self._people), len(self._employments), len(self._updates)
+
+    def commit(self):
+        """
+        Writes the overlay into the shared base store and starts a new, empty
+        overlay. Raises ValueError, writing nothing, if another session has
+        already committed a person with one of the new ids.
+        """
+        with self._lock:
+            taken = self.base.existing_person_ids(self._people)
+            if taken:
+                raise ValueError(f"Already in the shared dataset: {', '.join(sorted(taken))}")
+            self.base.add_many(people=self._people.values(), employments=self._employments)
+            for person_id, fields in self._updates.items():
+                self.base.update_person(person_id, **fields)
+        self._reset()
+
+    def discard(self):
+        """Drops every uncommitted change."""
+        self._reset()
+
+    # --- Reads (base + overlay) ---
+
+    def data_version(self):
+        """Returns a value that changes whenever this session or a commit writes."""
+        with self._lock:
+            return self.base.data_version(), self._version
+
+    def _merged(self, person):
+        updates = self._updates.get(person['id'])
+        return {**person, **updates} if updates else person
+
+    def get_person(self, person_id):
+        """Returns the person (with this session's updates) for an id, or None."""
+        if person_id in self._people:
+            return self._people[person_id]
+        with self._lock:
+            person = self.base.get_person(person_id)
+        return self._merged(person) if person is not None else None
+
+    def existing_person_ids(self, person_ids):
+        """Returns the subset of the given ids that belong to stored people."""
+        person_ids = set(person_ids)
+        with self._lock:
+            found = self.base.existing_person_ids(person_ids - self._people.keys())
+        return found | (person_ids & self._people.keys())
+
+    def search_people(self, offset=0, limit=50, **filters):
+        """
+        Returns (total matches, people on the page): base matches first, then
+        the overlay's new people (see compact_store.CompactStore.search_people).
+        """
+        with self._lock:
+            base_total, base_page = self.base.search_people(offset=offset, limit=limit, **filters)
+        overlay_total, positions = self._search_index.search(
+            offset=max(offset - base_total, 0), limit=max(limit - len(base_page), 0), **filters
+        )
+        page = [self._merged(person) for person in base_page]
+        page += [self._people[self._person_ids[position]] for position in positions]
+        return base_total + overlay_total, page
+
+    def employments_for(self, person_id):
+        """Returns the employments of a person, base first, in insertion order."""
+        with self._lock:
+            employments = list(self.base.employments_for(person_id))
+        return employments + self._employments_by_person.get(person_id, [])
+
+    def people(self):
+        """Returns all people, base first, in insertion order."""
+        with self._lock:
+            people = [self._merged(person) for person in self.base.people()]
+        return people + list(self._people.values())
+
+    def employments(self):
+        """Returns all employments, base first, in insertion order."""
+        with self._lock:
+            employments = list(self.base.employments())
+        return employments + self._employments
+
+    def companies(self):
+        """Returns the set of company names that appear in employment history."""
+        with self._lock:
+            companies = self.base.companies()
+        return companies | {employment['company_name'] for employment in self._employments}
+
+    def num_people(self):
+        with self._lock:
+            return self.base.num_people() + len(self._people)
+
+    def num_employments(self):
+        with self._lock:
+            return self.base.num_employments() + len(self._employments)
+
+    def shared_history(self, person_id):
+        """
+        Returns the Shared Work History over base and overlay employments
+        (see compact_store.CompactStore.shared_history).
+
+        Overlay stints at none of the person's companies cannot change their
+        pairs, so such people (the common case) are served from the base
+        store's cache. Other results are cached in the overlay, invalidated by
+        its writes like the base cache, and dropped whenever the base changes.
+        """
+        if person_id not in self._people and person_id not in self._employments_by_person:
+            with self._lock:
+                companies = {normalize_company_name(e['company_name']) for e in self.base.employments_for(person_id)}
+                rows = self.base.shared_history(person_id) if companies.isdisjoint(self._overlay_companies) else None
+            if rows is not None:
+                for row in rows:
+                    if row['person_id'] in self._updates:
+                        row['current_company_name'] = self.get_person(row['person_id'])['current_company_name']
+                return rows
+
+        today = date.today()
+        with self._lock:
+            base_version = self.base.data_version()
+        if base_version != self._cache_base_version:
+            # Another session committed: any entry may miss its stints
+            self.shared_history_cache.clear()
+            self._cache_base_version = base_version
+        rows = self.shared_history_cache.get(person_id, today)
+        if rows is None:
+            generation = self.shared_history_cache.generation()
+            stints = [(e['company_name'], e['start_date'], e['end_date']) for e in self.employments_for(person_id)]
+            rows = self._merged_shared_history(person_id, stints, today)
+            self.shared_history_cache.put(person_id, rows, stints, today, generation)
+        return [dict(row, current_company_name=self.get_person(row['person_id'])['current_company_name'])
+                for row in rows]
+
+    def _merged_shared_history(self, person_id, stints, today):
+        """Computes the Shared Work History rows (without current_company_name) over base and overlay pairs."""
+        with self._lock:
+            base = self.base.overlap_engine
+            base_pairs = base.overlapping(stints, exclude_person_id=person_id, today=today)
+            overlay_pairs = self.overlap_engine.overlapping(stints, exclude_person_id=person_id, today=today)
+            if not overlay_pairs.empty:
+                # Put overlay pairs in the merged people and employment order: base people
+                # first, then new people; a person's base stints before their overlay stints
+                new_positions = {pid: base.num_people() + i for i, pid in enumerate(self._person_ids)}
+                overlay_pairs['person_order'] = [base.person_order(pid) if pid not in new_positions
+                                                 else new_positions[pid] for pid in overlay_pairs['person_id']]
+                overlay_pairs['other_order'] += len(base)
+        if not overlay_pairs.empty:
+            pairs = pd.concat([base_pairs, overlay_pairs], ignore_index=True)
+            pairs = pairs.sort_values(by=["person_order", "stint", "other_order"], kind="stable")
+        else:
+            pairs = base_pairs
+        return summarize_shared_history(pairs).to_dict("records")
+
+    def coworker_graph(self):
+        """Returns the shared CoworkerGraph, which includes committed data only."""
+        with self._lock:
+            return self.base.coworker_graph()
+
+    def company_analytics(self):
+        """Returns the shared CompanyAnalytics, which includes committed data only."""
+        with self._lock:
+            return self.base.company_analytics()
+
+    def entity_resolver(self):
+        """Returns a resolver over the shared names and companies plus this session's additions."""
+        if self._entity_resolver is None:
+            self._entity_resolver = _LayeredResolver(self)
+        return self._entity_resolver
+
+
+class _LayeredResolver(EntityResolver):
+    """An EntityResolver over an overlay's additions that also consults the base store's resolver."""
+
+    def __init__(self, overlay):
+        super().__init__(overlay._people.values(), overlay._employments)
+        self._overlay = overlay
+        for fields in overlay._updates.values():
+            if fields.get('current_company_name'):
+                self.add_company(fields['current_company_name'])
+
+    def _base_matches(self, method, name, limit, min_score):
+        with self._overlay._lock:
+            resolver = self._overlay.base.entity_resolver()
+            return getattr(resolver, method)(name, limit=limit, min_score=min_score)
+
+    def match_person(self, name, limit=5, min_score=0.5):
+        matches = self._base_matches("match_person", name, limit, min_score) + \
+            super().match_person(name, limit=limit, min_score=min_score)
+        return sorted(matches, key=lambda match: -match[2])[:limit]
+
+    def match_company(self, name, limit=5, min_score=0.5):
+        # A company can be known to both layers; keep its best score
+        best = {}
+        for match in self._base_matches("match_company", name, limit, min_score) + \
+                super().match_company(name, limit=limit, min_score=min_score):
+            if match[0] not in best or match[2] > best[match[0]][2]:
+                best[match[0]] = match
+        return sorted(best.values(), key=lambda match: -match[2])[:limit]
@@ -0,0 +1,99 @@
+import re
+from array import array
+from bisect import bisect_left, insort
+from heapq import nsmallest
+
+SEARCH_FIELDS = ("name", "current_company_name", "current_title")
+_WORD = re.compile(r"\w+")
+
+
+def search_words(text):
+    """Splits text into casefolded words, the unit the search filters match on."""
+    return _WORD.findall(text.casefold())
+
+
+class _WordIndex:
+    """Word -> positions map for one field, with the words kept sorted for prefix lookups."""
+
+    def __init__(self):
+        self._postings = {}  # word -> array('i') of positions, ascending
+        self._words = []     # sorted distinct words
+
+    def add(self, position, text):
+        for word in set(search_words(text)):
+            posting = self._postings.get(word)
+            if posting is None:
+                posting = self._postings[word] = array('i')
+                insort(self._words, word)
+            if not posting or posting[-1] < position:
+                posting.append(position)  # the common case: a new person
+            else:
+                index = bisect_left(posting, position)
+                if index == len(posting) or posting[index] != position:
+                    posting.insert(index, position)
+
+    def remove(self, position, text):
+        for word in set(search_words(text)):
+            posting = self._postings.get(word)
+            if posting is not None:
+                index = bisect_left(posting, position)
+                if index < len(posting) and posting[index] == position:
+                    del posting[index]
+
+    def prefix(self, prefix):
+        """Returns the positions with a word starting with prefix."""
+        start = bisect_left(self._words, prefix)
+        stop = bisect_left(self._words, prefix + "\U0010ffff")
+        return set().union(*(self._postings[word] for word in self._words[start:stop]))
+
+
+class PeopleIndex:
+    """
+    Word-prefix index over people's name, current company and current title.
+
+    People are identified by their position (0, 1, 2, ... in insertion
+    order), which the store maps to ids. search() matches every query word
+    against the start of a word in the field ("dan sund" finds "Daniel
+    Sundheim"), intersects the fields and returns only the requested page, so
+    the cost depends on the number of matches rather than on the number of
+    people. Results keep insertion order.
+    """
+
+    def __init__(self):
+        self._size = 0
+        self._fields = {field: _WordIndex() for field in SEARCH_FIELDS}
+
+    def __len__(self):
+        return self._size
+
+    def add(self, position, person):
+        """Indexes the searchable fields of the person at a new position."""
+        self._size = max(self._size, position + 1)
+        for field, index in self._fields.items():
+            index.add(position, person.get(field) or "")
+
+    def update(self, position, old_fields, new_fields):
+        """Reindexes the searchable fields that changed from old_fields to new_fields."""
+        for field, value in new_fields.items():
+            if field in self._fields:
+                self._fields[field].remove(position, old_fields.get(field) or "")
+                self._fields[field].add(position, value or "")
+
+    def search(self, offset=0, limit=50, **filters):
+        """
+        Returns (total matches, positions on the page). filters map a field in
+        SEARCH_FIELDS to a query string; empty queries match everyone.
+        """
+        unknown = set(filters) - set(SEARCH_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown search fields: {', '.join(sorted(unknown))}")
+        matches = None
+        for field, query in filters.items():
+            for word in search_words(query or ""):
+                found = self._fields[field].prefix(word)
+                matches = found if matches is None else matches & found
+                if not matches:
+                    return 0, []
+        if matches is None:
+            return self._size, list(range(offset, min(offset + limit, self._size)))
+        return len(matches), nsmallest(offset + limit, matches)[offset:]
@@ -0,0 +1,117 @@
+import contextvars
+import json
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import wraps
+
+# The profile of the script run executing in this thread, if profiling is on
+_current = contextvars.ContextVar("rerun_profile", default=None)
+_log_lock = threading.Lock()
+
+
+class RerunProfile:
+    """
+    Wall time of named sections and call counts of instrumented helpers for
+    one script run. Sections may nest (each reports its inclusive time) and
+    may run several times per run (times add up).
+    """
+
+    def __init__(self, label=""):
+        self.label = label
+        self.started = time.perf_counter()
+        self.sections = {}  # name -> [seconds, runs], in first-entered order
+        self.calls = Counter()
+        self.total = None
+        self.interrupted = False
+        self._last_activity = self.started
+
+    @contextmanager
+    def section(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._last_activity = time.perf_counter()
+            entry = self.sections.setdefault(name, [0.0, 0])
+            entry[0] += self._last_activity - started
+            entry[1] += 1
+
+    def finish(self, interrupted=False):
+        """
+        Stops the clock. An interrupted run (ended early by st.rerun() or
+        st.stop()) is timed up to the end of its last section.
+        """
+        if self.total is None:
+            self.interrupted = interrupted
+            end = self._last_activity if interrupted else time.perf_counter()
+            self.total = end - self.started
+        return self
+
+    def to_record(self):
+        """Returns the profile as a JSON-serializable dictionary (times in milliseconds)."""
+        return {
+            "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "label": self.label,
+            "total_ms": round(self.total * 1000, 3) if self.total is not None else None,
+            "interrupted": self.interrupted,
+            "sections": {name: {"ms": round(seconds * 1000, 3), "runs": runs}
+                         for name, (seconds, runs) in self.sections.items()},
+            "calls": dict(self.calls),
+        }
+
+
+def start(label=""):
+    """Starts profiling the script run in the current thread and returns its RerunProfile."""
+    profile = RerunProfile(label)
+    _current.set(profile)
+    return profile
+
+
+def stop(interrupted=False):
+    """Stops profiling the current run and returns its finished RerunProfile, or None if none was started."""
+    profile = _current.get()
+    _current.set(None)
+    return profile.finish(interrupted) if profile is not None else None
+
+
+@contextmanager
+def section(name):
+    """Times the enclosed block as section `name` of the current run; does nothing when profiling is off."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    with profile.section(name):
+        yield
+
+
+def timed(name):
+    """Decorator form of section(): times every call of the function as section `name`."""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with section(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def counted(func):
+    """Counts the calls to func in the current run's profile (under its __name__) when profiling is on."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        profile = _current.get()
+        if profile is not None:
+            profile.calls[func.__name__] += 1
+        return func(*args, **kwargs)
+    return wrapper
+
+
+def append_jsonl(path, profile):
+    """Appends the profile to a JSON Lines file, one run per line (safe across sessions of one process)."""
+    line = json.dumps(profile.to_record())
+    with _log_lock, open(path, "a", encoding="utf-8") as log:
+        log.write(line + "\n")
@@ -0,0 +1,432 @@
+import json
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from company_analytics import CompanyAnalytics
+from coworker_graph import CoworkerGraph
+from entity_matcher import EntityResolver
+from history_cache import SharedHistoryCache
+from overlap import DAYS_PER_YEAR, OverlapEngine, normalize_company_name, summarize_shared_history
+from people_index import SEARCH_FIELDS, search_words
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS people (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    current_title TEXT NOT NULL DEFAULT '',
+    current_company_name TEXT NOT NULL DEFAULT '',
+    email TEXT NOT NULL DEFAULT '',
+    linkedin_profile_url TEXT NOT NULL DEFAULT '',
+    reference_list_url TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS employments (
+    id TEXT PRIMARY KEY,
+    person_id TEXT NOT NULL REFERENCES people(id),
+    company_name TEXT NOT NULL,
+    company_key TEXT NOT NULL,  -- normalize_company_name(company_name)
+    title TEXT NOT NULL,
+    start_date TEXT NOT NULL,   -- ISO 8601 (YYYY-MM-DD)
+    end_date TEXT               -- ISO 8601, NULL while the stint is ongoing
+);
+CREATE INDEX IF NOT EXISTS idx_employments_person_id ON employments(person_id);
+CREATE INDEX IF NOT EXISTS idx_employments_company ON employments(company_key, start_date);
+
+-- Full-text index over the list filters, kept in sync with people by triggers
+CREATE VIRTUAL TABLE IF NOT EXISTS people_search USING fts5(
+    name, current_company_name, current_title,
+    content='people', content_rowid='rowid', tokenize='unicode61 remove_diacritics 0'
+);
+CREATE TRIGGER IF NOT EXISTS people_search_insert AFTER INSERT ON people BEGIN
+    INSERT INTO people_search (rowid, name, current_company_name, current_title)
+    VALUES (new.rowid, new.name, new.current_company_name, new.current_title);
+END;
+CREATE TRIGGER IF NOT EXISTS people_search_delete AFTER DELETE ON people BEGIN
+    INSERT INTO people_search (people_search, rowid, name, current_company_name, current_title)
+    VALUES ('delete', old.rowid, old.name, old.current_company_name, old.current_title);
+END;
+CREATE TRIGGER IF NOT EXISTS people_search_update AFTER UPDATE ON people BEGIN
+    INSERT INTO people_search (people_search, rowid, name, current_company_name, current_title)
+    VALUES ('delete', old.rowid, old.name, old.current_company_name, old.current_title);
+    INSERT INTO people_search (rowid, name, current_company_name, current_title)
+    VALUES (new.rowid, new.name, new.current_company_name, new.current_title);
+END;
+"""
+# Bumped whenever SCHEMA gains something that existing databases must backfill
+SCHEMA_VERSION = 1
+
+PERSON_COLUMNS = ("id", "name", "current_title", "current_company_name",
+                  "email", "linkedin_profile_url", "reference_list_url")
+EMPLOYMENT_COLUMNS = ("id", "person_id", "company_name", "title", "start_date", "end_date")
+FETCH_SIZE = 50_000  # rows per fetchmany() when reading whole tables
+
+# Same rules as calculate_overlap_years: NULL end dates count as :today, and
+# only strictly positive overlaps (after rounding to 2 decimals) are kept.
+# Companies match exactly as entered (company_key only narrows the index
+# range). Like OverlapEngine.overlapping, the first pair per (name, company)
+# in the original scan's order (people, selected stint, other stint) wins;
+# rows come back in that order, with the overlap in days for the caller to
+# round and sort (see summarize_shared_history).
+SHARED_HISTORY_SQL = """
+WITH pairs AS (
+    SELECT o.person_id AS person_id,
+           p.name AS name,
+           s.company_name AS company_name,
+           CAST(julianday(MIN(COALESCE(s.end_date, :today), COALESCE(o.end_date, :today)))
+                - julianday(MAX(s.start_date, o.start_date)) AS INTEGER) AS overlap_days,
+           p.rowid AS person_order,
+           s.rowid AS selected_order,
+           o.rowid AS other_order
+    FROM employments AS s
+    JOIN employments AS o
+      ON o.company_key = s.company_key
+     AND o.company_name = s.company_name
+     AND o.person_id != s.person_id
+     AND o.start_date < COALESCE(s.end_date, :today)
+     AND COALESCE(o.end_date, :today) > s.start_date
+    JOIN people AS p ON p.id = o.person_id
+    WHERE s.person_id = :person_id
+), ranked AS (
+    SELECT *, ROW_NUMBER() OVER (
+        PARTITION BY name, company_name ORDER BY person_order, selected_order, other_order
+    ) AS pair_rank
+    FROM pairs
+    WHERE ROUND(overlap_days / 365.25, 2) > 0
+)
+SELECT person_id, name, company_name, overlap_days
+FROM ranked
+WHERE pair_rank = 1
+ORDER BY person_order, selected_order, other_order
+"""
+
+
+def _to_date(value):
+    return date.fromisoformat(value) if value is not None else None
+
+
+def _to_text(value):
+    return value.isoformat() if value is not None else None
+
+
+class ConnectionPool:
+    """
+    A small thread-safe pool of SQLite connections to one database file.
+
+    Streamlit runs every session's script in its own thread, so a single
+    connection cannot be shared; connections are checked out per operation.
+    """
+
+    def __init__(self, path, size=8):
+        self.path = path
+        self._pool = queue.LifoQueue()
+        for _ in range(size):
+            self._pool.put(self._connect())
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")  # readers don't block the writer
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Checks out a connection; commits on success and rolls back on error."""
+        conn = self._pool.get()
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._pool.put(conn)
+
+
+class SQLiteStore:
+    """
+    SQLite-backed store with the same interface as compact_store.CompactStore.
+
+    Nothing is loaded into memory up front: each lookup is an indexed query,
+    and the Shared Work History overlap is computed by a self-join on
+    employments, so one store can be shared by every session in the process.
+    """
+
+    def __init__(self, path, people=(), employments=(), pool_size=8):
+        self.pool = ConnectionPool(path, size=pool_size)
+        self._coworker_graph = None  # built on first use, then kept up to date
+        self._entity_resolver = None  # likewise
+        self._company_analytics = None  # likewise
+        self._companies = None  # distinct company names, likewise
+        self._counts = None     # [people, employments], likewise
+        self._graph_lock = threading.Lock()  # guards all five
+        self.shared_history_cache = SharedHistoryCache()  # public for its hit and miss counts
+        self._data_version = 0  # bumped by every write made through this store
+        with self.pool.connection() as conn:
+            conn.executescript(SCHEMA)
+            if conn.execute("PRAGMA user_version").fetchone()[0] < 1:
+                # Databases created before the search index existed
+                conn.execute("INSERT INTO people_search (people_search) VALUES ('rebuild')")
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        if people or employments:
+            self.add_many(people, employments)
+
+    # --- Writes ---
+
+    def add_person(self, person):
+        """Adds a person dictionary (must carry a unique 'id')."""
+        self.add_many(people=[person])
+
+    def add_employment(self, employment):
+        """Adds an employment dictionary."""
+        self.add_many(employments=[employment])
+
+    def add_many(self, people=(), employments=()):
+        """Inserts people and employments in a single transaction."""
+        people, employments = list(people), list(employments)
+        # Held across the insert so a concurrent graph or resolver build cannot
+        # see these rows in the database and then receive them again below.
+        with self._graph_lock:
+            with self.pool.connection() as conn:
+                conn.executemany(
+                    f"INSERT INTO people ({', '.join(PERSON_COLUMNS)}) VALUES ({', '.join('?' * len(PERSON_COLUMNS))})",
+                    ([p.get(column) or '' for column in PERSON_COLUMNS] for p in people),
+                )
+                conn.executemany(
+                    "INSERT INTO employments (id, person_id, company_name, company_key, title, start_date, end_date) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    ((e['id'], e['person_id'], e['company_name'], normalize_company_name(e['company_name']),
+                      e['title'], _to_text(e['start_date']), _to_text(e['end_date'])) for e in employments),
+                )
+            self._data_version += 1
+            for employment in employments:
+                self.shared_history_cache.invalidate_employment(employment)
+            if self._coworker_graph is not None:
+                engine = self._coworker_graph.engine
+                for person in people:
+                    engine.add_person(person['id'], person['name'])
+                    self._coworker_graph.add_person(person['id'])
+                for employment in employments:
+                    engine.add_employment(employment)
+                    self._coworker_graph.add_employment(employment)
+            if self._entity_resolver is not None:
+                for person in people:
+                    self._entity_resolver.add_person(person)
+                for employment in employments:
+                    self._entity_resolver.add_employment(employment)
+            if self._company_analytics is not None:
+                for employment in employments:
+                    self._company_analytics.add(employment)
+            if self._companies is not None:
+                self._companies.update(employment['company_name'] for employment in employments)
+            if self._counts is not None:
+                self._counts[0] += len(people)
+                self._counts[1] += len(employments)
+
+    def update_person(self, person_id, **fields):
+        """Updates the given fields of a person."""
+        unknown = set(fields) - set(PERSON_COLUMNS[1:])
+        if unknown:
+            raise ValueError(f"Unknown person fields: {', '.join(sorted(unknown))}")
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self.pool.connection() as conn:
+            conn.execute(f"UPDATE people SET {assignments} WHERE id = ?", (*fields.values(), person_id))
+        with self._graph_lock:
+            self._data_version += 1
+            if 'name' in fields:
+                self.shared_history_cache.clear()  # names decide dedup and order
+                if self._coworker_graph is not None:
+                    self._coworker_graph.engine.add_person(person_id, fields['name'])
+            if self._entity_resolver is not None and fields.get('current_company_name'):
+                self._entity_resolver.add_company(fields['current_company_name'])
+
+    # --- Reads ---
+
+    def data_version(self):
+        """Returns a counter that changes whenever people or employments are written through this store."""
+        return self._data_version
+
+    def get_person(self, person_id):
+        """Returns the person dictionary for an id, or None."""
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT * FROM people WHERE id = ?", (person_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def existing_person_ids(self, person_ids):
+        """Returns the subset of the given ids that belong to stored people."""
+        person_ids = list(person_ids)
+        found = set()
+        with self.pool.connection() as conn:
+            for offset in range(0, len(person_ids), 900):  # stay under SQLite's bound-parameter limit
+                batch = person_ids[offset:offset + 900]
+                rows = conn.execute(f"SELECT id FROM people WHERE id IN ({', '.join('?' * len(batch))})", batch)
+                found.update(row[0] for row in rows)
+        return found
+
+    def search_people(self, offset=0, limit=50, **filters):
+        """
+        Returns (total matches, person dictionaries on the page) for word-prefix
+        filters on name, current_company_name and current_title, in insertion
+        order (see compact_store.CompactStore.search_people).
+        """
+        unknown = set(filters) - set(SEARCH_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown search fields: {', '.join(sorted(unknown))}")
+        terms = [f'{field} : "{word}" *' for field, query in filters.items() for word in search_words(query or "")]
+        with self.pool.connection() as conn:
+            if not terms:
+                total = self.num_people()
+                rows = conn.execute("SELECT * FROM people ORDER BY rowid LIMIT ? OFFSET ?", (limit, offset))
+                return total, [dict(row) for row in rows]
+            match = " AND ".join(terms)
+            total = conn.execute("SELECT COUNT(*) FROM people_search WHERE people_search MATCH ?", (match,)).fetchone()[0]
+            rows = conn.execute(
+                "SELECT people.* FROM people_search JOIN people ON people.rowid = people_search.rowid "
+                "WHERE people_search MATCH ? ORDER BY people_search.rowid LIMIT ? OFFSET ?",
+                (match, limit, offset),
+            )
+            return total, [dict(row) for row in rows]
+
+    def employments_for(self, person_id):
+        """Returns the employment dictionaries of a person, in insertion order."""
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(EMPLOYMENT_COLUMNS)} FROM employments WHERE person_id = ? ORDER BY rowid",
+                (person_id,),
+            ).fetchall()
+        return [self._employment(row) for row in rows]
+
+    def people(self):
+        """Returns all person dictionaries, in insertion order."""
+        with self.pool.connection() as conn:
+            return [dict(row) for row in conn.execute("SELECT * FROM people ORDER BY rowid")]
+
+    def employments(self):
+        """Returns all employment dictionaries, in insertion order."""
+        with self.pool.connection() as conn:
+            rows = conn.execute(f"SELECT {', '.join(EMPLOYMENT_COLUMNS)} FROM employments ORDER BY rowid").fetchall()
+        return [self._employment(row) for row in rows]
+
+    def employment_columns(self):
+        """
+        Returns every employment field except id as a column, for bulk export;
+        dates are datetime64[D] with NaT while ongoing. Rows are read in
+        chunks, without building a dictionary per employment.
+        """
+        fields = EMPLOYMENT_COLUMNS[1:]
+        columns = {field: [] for field in fields}
+        with self.pool.connection() as conn:
+            cursor = conn.execute(f"SELECT {', '.join(fields)} FROM employments ORDER BY rowid")
+            rows = cursor.fetchmany(FETCH_SIZE)
+            while rows:
+                for field, values in zip(fields, zip(*rows)):
+                    columns[field].extend(values)
+                rows = cursor.fetchmany(FETCH_SIZE)
+        for field in ("start_date", "end_date"):
+            columns[field] = np.array(columns[field], dtype="datetime64[D]")
+        return columns
+
+    def companies(self):
+        """Returns the set of company names that appear in employment history."""
+        # Read once per process (a full scan), then kept up to date by add_many
+        with self._graph_lock:
+            if self._companies is None:
+                with self.pool.connection() as conn:
+                    self._companies = {row[0] for row in conn.execute("SELECT DISTINCT company_name FROM employments")}
+            return set(self._companies)
+
+    def _row_counts(self):
+        """Returns [people, employments]: counted once per process (full scans), then kept up to date by add_many."""
+        with self._graph_lock:
+            if self._counts is None:
+                with self.pool.connection() as conn:
+                    self._counts = [conn.execute("SELECT COUNT(*) FROM people").fetchone()[0],
+                                    conn.execute("SELECT COUNT(*) FROM employments").fetchone()[0]]
+            return list(self._counts)
+
+    def num_people(self):
+        return self._row_counts()[0]
+
+    def num_employments(self):
+        return self._row_counts()[1]
+
+    def shared_history(self, person_id):
+        """
+        Returns the overlapping stints of other people at the selected person's
+        companies (see compact_store.CompactStore.shared_history), cached per person.
+        """
+        today = date.today()
+        rows = self.shared_history_cache.get(person_id, today)
+        if rows is None:
+            generation = self.shared_history_cache.generation()
+            with self.pool.connection() as conn:
+                pairs = pd.DataFrame([dict(row) for row in conn.execute(
+                    SHARED_HISTORY_SQL, {"person_id": person_id, "today": today.isoformat()})],
+                    columns=["person_id", "name", "company_name", "overlap_days"])
+            pairs['overlap_years'] = [round(days / DAYS_PER_YEAR, 2) for days in pairs.pop('overlap_days')]
+            rows = summarize_shared_history(pairs).to_dict("records")
+            stints = [(e['company_name'], e['start_date'], e['end_date']) for e in self.employments_for(person_id)]
+            self.shared_history_cache.put(person_id, rows, stints, today, generation)
+        with self.pool.connection() as conn:
+            current = dict(conn.execute(
+                "SELECT id, current_company_name FROM people WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps([row['person_id'] for row in rows]),),
+            ).fetchall())
+        return [dict(row, current_company_name=current[row['person_id']]) for row in rows]
+
+    def coworker_graph(self):
+        """Returns the process-wide CoworkerGraph, building it from the database on first use."""
+        with self._graph_lock:
+            if self._coworker_graph is None:
+                self._coworker_graph = CoworkerGraph(self._overlap_engine())
+            return self._coworker_graph
+
+    def _load_entity_resolver(self):
+        """Returns an EntityResolver over all names and companies, streamed from the database."""
+        resolver = EntityResolver()
+        with self.pool.connection() as conn:
+            for person_id, name, company_name in conn.execute(
+                    "SELECT id, name, current_company_name FROM people ORDER BY rowid"):
+                resolver.add_person({"id": person_id, "name": name, "current_company_name": company_name})
+            # Each spelling once, in first-seen order like the per-employment adds
+            for (company_name,) in conn.execute(
+                    "SELECT company_name FROM employments GROUP BY company_name ORDER BY MIN(rowid)"):
+                resolver.add_company(company_name)
+        return resolver
+
+    def _overlap_engine(self):
+        """Returns an OverlapEngine over all people and employments, streamed from the database."""
+        engine = OverlapEngine()
+        with self.pool.connection() as conn:
+            for person_id, name in conn.execute("SELECT id, name FROM people ORDER BY rowid"):
+                engine.add_person(person_id, name)
+            rows = conn.execute("SELECT person_id, company_name, start_date, end_date FROM employments ORDER BY rowid")
+            for person_id, company_name, start_date, end_date in rows:
+                engine.add_employment({"person_id": person_id, "company_name": company_name,
+                                       "start_date": _to_date(start_date), "end_date": _to_date(end_date)})
+        return engine
+
+    def entity_resolver(self):
+        """Returns the process-wide EntityResolver, building it from the database on first use."""
+        with self._graph_lock:
+            if self._entity_resolver is None:
+                self._entity_resolver = self._load_entity_resolver()
+            return self._entity_resolver
+
+    def company_analytics(self):
+        """Returns the process-wide CompanyAnalytics, building it from the database on first use."""
+        with self._graph_lock:
+            if self._company_analytics is None:
+                columns = self.employment_columns()
+                self._company_analytics = CompanyAnalytics.from_columns(
+                    columns['person_id'], columns['company_name'], columns['start_date'], columns['end_date'])
+            return self._company_analytics
+
+    @staticmethod
+    def _employment(row):
+        employment = dict(row)
+        employment['start_date'] = _to_date(employment['start_date'])
+        employment['end_date'] = _to_date(employment['end_date'])
+        return employment
@@ -0,0 +1,108 @@
+import random
+import uuid
+from datetime import date, timedelta
+from itertools import accumulate
+
+SYLLABLES = ("an", "be", "ca", "de", "el", "fi", "go", "ha", "is", "jo", "ka", "li", "ma", "no", "or", "pe",
+             "ra", "si", "ta", "ul", "va", "wi", "xa", "yo", "ze")
+COMPANY_SUFFIXES = ("Capital", "Capital Partners", "Capital Management", "Asset Management", "Global Investors",
+                    "Partners LP", "Advisors", "Group", "Holdings", "Investments")
+# Seniority ladder; each new stint moves zero to two steps up
+TITLES = ("Analyst", "Associate", "Senior Associate", "Vice President", "Principal", "Director",
+          "Portfolio Manager", "Partner", "Managing Director")
+# Default "today" of generated networks: careers end and stints stay open
+# relative to it, so it is fixed rather than the current date
+NETWORK_TODAY = date(2025, 1, 1)
+
+
+def random_word(rng, low, high):
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(low, high))).title()
+
+
+def random_name(rng):
+    """Returns a pronounceable "First Last" name."""
+    return f"{random_word(rng, 2, 3)} {random_word(rng, 2, 4)}"
+
+
+def _random_uuid(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def company_names(num_companies, rng):
+    """Returns num_companies distinct company names."""
+    names, seen = [], set()
+    while len(names) < num_companies:
+        name = f"{random_word(rng, 1, 3)} {rng.choice(COMPANY_SUFFIXES)}"
+        if name not in seen:
+            seen.add(name)
+            names.append(name)
+    return names
+
+
+def generate_network(num_people, seed=0, num_companies=None, company_size_exponent=1.0,
+                     mean_stints=2.2, current_share=0.85, first_year=1990, today=NETWORK_TODAY):
+    """
+    Returns a reproducible synthetic (people, employments) pair in the store's
+    dictionary format: the same arguments give the same data in every process.
+
+    - Company sizes follow a power law: the company of rank r is picked with
+      weight 1 / r ** company_size_exponent, so a few firms employ thousands
+      and most employ a handful (num_companies defaults to num_people / 20).
+    - Each person has a career of consecutive stints (mean_stints on
+      average, with short gaps), climbing the TITLES ladder.
+    - A person's last stint is open-ended (end_date None) with probability
+      current_share and becomes their current company and title.
+    - Ids are uuid4 strings drawn from the seeded generator, and dates are
+      relative to today (NETWORK_TODAY unless given), not the current date.
+    """
+    rng = random.Random(seed)
+    num_companies = num_companies or max(num_people // 20, 10)
+    companies = company_names(num_companies, rng)
+    cum_weights = list(accumulate(1.0 / (rank + 1) ** company_size_exponent for rank in range(num_companies)))
+    # Number of stints is 1 + geometric, with the requested mean
+    extra_stint_chance = 1.0 - 1.0 / mean_stints
+    first_day = date(first_year, 1, 1).toordinal()
+    last_start_day = today.toordinal() - 30
+
+    people, employments = [], []
+    for _ in range(num_people):
+        name = random_name(rng)
+        person = {
+            "id": _random_uuid(rng),
+            "name": name,
+            "current_title": "",
+            "current_company_name": "",
+            "email": f"{name.replace(' ', '.').lower()}@example.com" if rng.random() < 0.3 else "",
+            "linkedin_profile_url": (f"https://linkedin.com/in/{name.replace(' ', '').lower()}"
+                                     if rng.random() < 0.5 else ""),
+            "reference_list_url": "",
+        }
+        people.append(person)
+
+        num_stints = 1
+        while num_stints < 8 and rng.random() < extra_stint_chance:
+            num_stints += 1
+        day = rng.randrange(first_day, last_start_day)
+        level = rng.randrange(3)
+        career = rng.choices(companies, cum_weights=cum_weights, k=num_stints)
+        for stint, company in enumerate(career):
+            start = date.fromordinal(day)
+            end = start + timedelta(days=rng.randrange(180, 365 * 7))
+            is_last = stint == num_stints - 1 or end.toordinal() + 180 > last_start_day
+            if end >= today or (is_last and rng.random() < current_share):
+                end = None
+            title = TITLES[min(level, len(TITLES) - 1)]
+            employments.append({
+                "id": _random_uuid(rng),
+                "person_id": person['id'],
+                "company_name": company,
+                "title": title,
+                "start_date": start,
+                "end_date": end,
+            })
+            person['current_title'], person['current_company_name'] = title, company
+            if end is None or is_last:
+                break
+            day = end.toordinal() + 1 + rng.randrange(180)
+            level += rng.randrange(3)
+    return people, employments